@@ -13,6 +13,8 @@ from datetime import datetime
 import aiohttp
 from dataclasses import dataclass, asdict
 
+from ailo_io import load_json
+
 
 @dataclass
 class ConversationMessage:
@@ -63,6 +65,11 @@ class AILOChatbot:
         # Conversation history
         self.conversation_history = []
         
+        # Pooled HTTP session for LM Studio, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connection_ok = False
+        
         # System prompt
         self.system_prompt = self._create_system_prompt()
         
@@ -173,9 +180,8 @@ class AILOChatbot:
         if vector_file.exists():
             try:
                 self.logger.info("Vectorization dataset found, loading...")
-                with open(vector_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.knowledge_base = data if isinstance(data, list) else data.get('documents', [])
+                data = load_json(vector_file)
+                self.knowledge_base = data if isinstance(data, list) else data.get('documents', [])
                 
                 self.logger.info(f"✓ Successfully loaded {len(self.knowledge_base)} documents into knowledge base")
                 
@@ -205,18 +211,17 @@ class AILOChatbot:
         for json_file in json_files:
             try:
                 self.logger.debug(f"Processing: {json_file.name}")
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Convert raw data to knowledge base format
-                    doc = {
-                        'id': json_file.stem,
-                        'title': json_file.stem.replace('_', ' ').title(),
-                        'text': json.dumps(data, ensure_ascii=False),
-                        'source_endpoint': json_file.stem,
-                        'metadata': {'file': json_file.name}
-                    }
-                    self.knowledge_base.append(doc)
+                data = load_json(json_file)
+                
+                # Convert raw data to knowledge base format
+                doc = {
+                    'id': json_file.stem,
+                    'title': json_file.stem.replace('_', ' ').title(),
+                    'text': json.dumps(data, ensure_ascii=False),
+                    'source_endpoint': json_file.stem,
+                    'metadata': {'file': json_file.name}
+                }
+                self.knowledge_base.append(doc)
                     
             except Exception as e:
                 self.logger.warning(f"⚠ Error loading {json_file}: {e}")
@@ -663,56 +668,56 @@ class AILOChatbot:
             
             # Call LM Studio API
             self.logger.info(f"Calling LM Studio API at {self.lm_studio_url}...")
-            async with aiohttp.ClientSession() as session:
-                api_payload = {
-                    "model": self.model_name,
-                    "messages": messages,
-                    "temperature": 0.5,
-                    "max_tokens": 1500,
-                    "stream": False
-                }
-                self.logger.debug(f"API Payload: model={self.model_name}, temperature=0.5, max_tokens=1500")
+            session = self._get_session()
+            api_payload = {
+                "model": self.model_name,
+                "messages": messages,
+                "temperature": 0.5,
+                "max_tokens": 1500,
+                "stream": False
+            }
+            self.logger.debug(f"API Payload: model={self.model_name}, temperature=0.5, max_tokens=1500")
+            
+            async with session.post(
+                f"{self.lm_studio_url}/chat/completions",
+                json=api_payload
+            ) as response:
+                self.logger.debug(f"API Response Status: {response.status}")
                 
-                async with session.post(
-                    f"{self.lm_studio_url}/chat/completions",
-                    json=api_payload
-                ) as response:
-                    self.logger.debug(f"API Response Status: {response.status}")
+                if response.status == 200:
+                    result = await response.json()
+                    assistant_message = result['choices'][0]['message']['content']
+                    
+                    self.logger.info("✓ Successfully received response from LLM")
+                    self.logger.info(f"Response length: {len(assistant_message)} characters")
+                    self.logger.debug(f"Assistant response: {assistant_message[:200]}...")
+                    
+                    # Validate that response includes sources (basic check)
+                    source_count = assistant_message.lower().count("kilde:")
+                    self.logger.info(f"Source citations found in response: {source_count}")
+                    
+                    if "kilde:" not in assistant_message.lower() and len(context) > 100:
+                        # Add a reminder if sources are missing
+                        self.logger.warning("⚠ Response is missing source citations!")
+                        assistant_message += ("\n\n⚠️ Merk: All informasjon i dette svaret er basert på data fra utdanning.no. "
+                                             "Jeg burde ha oppgitt spesifikke kilder for hver påstand.")
+                    
+                    # Save to conversation history
+                    self.conversation_history.append(
+                        ConversationMessage(role="user", content=user_message)
+                    )
+                    self.conversation_history.append(
+                        ConversationMessage(role="assistant", content=assistant_message)
+                    )
+                    self.logger.debug(f"Conversation history now has {len(self.conversation_history)} messages")
+                    
+                    self.logger.info("=" * 80)
+                    return assistant_message
+                else:
+                    error_text = await response.text()
+                    self.logger.error(f"✗ API error {response.status}: {error_text}")
+                    return f"Beklager, jeg fikk en feil fra serveren: {response.status}"
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        assistant_message = result['choices'][0]['message']['content']
-                        
-                        self.logger.info("✓ Successfully received response from LLM")
-                        self.logger.info(f"Response length: {len(assistant_message)} characters")
-                        self.logger.debug(f"Assistant response: {assistant_message[:200]}...")
-                        
-                        # Validate that response includes sources (basic check)
-                        source_count = assistant_message.lower().count("kilde:")
-                        self.logger.info(f"Source citations found in response: {source_count}")
-                        
-                        if "kilde:" not in assistant_message.lower() and len(context) > 100:
-                            # Add a reminder if sources are missing
-                            self.logger.warning("⚠ Response is missing source citations!")
-                            assistant_message += ("\n\n⚠️ Merk: All informasjon i dette svaret er basert på data fra utdanning.no. "
-                                                 "Jeg burde ha oppgitt spesifikke kilder for hver påstand.")
-                        
-                        # Save to conversation history
-                        self.conversation_history.append(
-                            ConversationMessage(role="user", content=user_message)
-                        )
-                        self.conversation_history.append(
-                            ConversationMessage(role="assistant", content=assistant_message)
-                        )
-                        self.logger.debug(f"Conversation history now has {len(self.conversation_history)} messages")
-                        
-                        self.logger.info("=" * 80)
-                        return assistant_message
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"✗ API error {response.status}: {error_text}")
-                        return f"Beklager, jeg fikk en feil fra serveren: {response.status}"
-                        
         except aiohttp.ClientConnectorError:
             self.logger.error("✗ Could not connect to LM Studio server")
             return "Beklager, jeg kan ikke koble til LM Studio serveren. Sjekk at den kjører på http://localhost:1234"
@@ -748,29 +753,60 @@ class AILOChatbot:
         except Exception as e:
             self.logger.error(f"✗ Error saving conversation: {e}", exc_info=True)
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled LM Studio session, creating it on first use.
+        
+        A session is tied to the event loop it was created on, so a new one is
+        made if the running loop has changed.
+        
+        Returns:
+            Client session with keep-alive connections to LM Studio
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the LM Studio session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
     async def test_connection(self) -> bool:
         """
         Test connection to LM Studio server.
         
+        A successful result is remembered, so later calls return immediately.
+        
         Returns:
             True if connection successful
         """
+        if self._connection_ok:
+            return True
+        
         self.logger.info("Testing connection to LM Studio server...")
         self.logger.debug(f"Server URL: {self.lm_studio_url}")
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.lm_studio_url}/models") as response:
-                    self.logger.debug(f"Response status: {response.status}")
-                    
-                    if response.status == 200:
-                        models = await response.json()
-                        self.logger.info(f"✅ Connected to LM Studio server")
-                        self.logger.info(f"Available models: {models}")
-                        return True
-                    else:
-                        self.logger.error(f"❌ Server returned status {response.status}")
-                        return False
+            session = self._get_session()
+            async with session.get(f"{self.lm_studio_url}/models") as response:
+                self.logger.debug(f"Response status: {response.status}")
+                
+                if response.status == 200:
+                    models = await response.json()
+                    self.logger.info(f"✅ Connected to LM Studio server")
+                    self.logger.info(f"Available models: {models}")
+                    self._connection_ok = True
+                    return True
+                else:
+                    self.logger.error(f"❌ Server returned status {response.status}")
+                    return False
         except aiohttp.ClientConnectorError as e:
             self.logger.error("❌ Could not connect to LM Studio server at " + self.lm_studio_url)
             self.logger.error("   Make sure LM Studio is running and the server is started")
@@ -794,6 +830,14 @@ async def interactive_chat():
     ailo = AILOChatbot()
     ailo.logger.info("Interactive chat session started")
     
+    try:
+        await _chat_session(ailo)
+    finally:
+        await ailo.close()
+
+
+async def _chat_session(ailo: AILOChatbot):
+    """Connect, load the knowledge base and run the chat loop."""
     # Test connection
     print("Testing connection to LM Studio server...")
     ailo.logger.info("Testing LM Studio connection...")
@@ -525,36 +525,39 @@ class AILOEvaluationFramework:
         print("=" * 70)
 
 
-async def main():
-    """Main function to run evaluation."""
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="AILO Evaluation Framework")
-    parser.add_argument("--max-questions", type=int, default=None,
-                       help="Maximum number of questions to test (default: all)")
-    parser.add_argument("--sample-categories", action="store_true",
-                       help="Sample evenly from categories")
-    parser.add_argument("--output", type=str, default=None,
-                       help="Output filename for report")
-    
-    args = parser.parse_args()
+async def main(max_questions: Optional[int] = None, sample_categories: bool = False,
+               output: Optional[str] = None) -> int:
+    """
+    Main function to run evaluation.
     
+    Args:
+        max_questions: Maximum number of questions to test (None for all)
+        sample_categories: Sample evenly from categories
+        output: Output filename for report
+        
+    Returns:
+        Exit code (0 on success)
+    """
     # Initialize framework
     framework = AILOEvaluationFramework()
     
     if not await framework.initialize():
         print("❌ Failed to initialize. Please check prerequisites.")
-        return
+        await framework.ailo.close()
+        return 1
     
     # Run evaluation
-    report = await framework.run_evaluation(
-        max_questions=args.max_questions,
-        sample_categories=args.sample_categories
-    )
+    try:
+        report = await framework.run_evaluation(
+            max_questions=max_questions,
+            sample_categories=sample_categories
+        )
+    finally:
+        await framework.ailo.close()
     
     # Print and save report
     framework.print_report(report)
-    framework.save_report(report, args.output)
+    framework.save_report(report, output)
     
     # Final grade
     avg_score = report['summary']['average_score']
@@ -579,11 +582,29 @@ async def main():
     print(f"║  FINAL GRADE: {grade:40s} {emoji}     ║")
     print("╚" + "═" * 68 + "╝")
     print()
+    
+    return 0
+
+
+def parse_args():
+    """Parse command line arguments."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AILO Evaluation Framework")
+    parser.add_argument("--max-questions", type=int, default=None,
+                       help="Maximum number of questions to test (default: all)")
+    parser.add_argument("--sample-categories", action="store_true",
+                       help="Sample evenly from categories")
+    parser.add_argument("--output", type=str, default=None,
+                       help="Output filename for report")
+    
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.max_questions, args.sample_categories, args.output))
     except KeyboardInterrupt:
         print("\n\nEvaluation interrupted by user.")
     except Exception as e:
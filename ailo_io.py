@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+AILO I/O helpers
+Fast JSON loading for the knowledge base and other data files
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """
+    Load a JSON file, using orjson when it is installed.
+
+    Args:
+        path: Path to JSON file
+
+    Returns:
+        Parsed JSON data
+    """
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -103,7 +103,11 @@ async def chat():
         
         # Get response from AILO
         logger.info(f"Processing message: {user_message[:50]}...")
-        response = await ailo_instance.chat(user_message)
+        try:
+            response = await ailo_instance.chat(user_message)
+        finally:
+            # Each request runs on its own event loop, so its session can't be reused
+            await ailo_instance.close()
         
         return jsonify({
             'response': response,
@@ -204,6 +208,7 @@ def run_async_chat(user_message):
     try:
         return loop.run_until_complete(ailo.chat(user_message))
     finally:
+        loop.run_until_complete(ailo.close())
         loop.close()
 
 
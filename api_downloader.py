@@ -12,9 +12,40 @@ from pathlib import Path
 from typing import Dict, List, Optional, Union, Any, Set, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 import re
+from functools import lru_cache
 from tqdm.asyncio import tqdm as atqdm
 from itertools import product
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+# Characters that are not safe in filenames, and runs of underscores
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*{}]')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+
+@lru_cache(maxsize=4096)
+def _safe_filename(path: str) -> str:
+    """
+    Turn a URL path into a safe filename.
+    
+    Concrete URLs expanded from the same template share most of their path,
+    so results are cached.
+    
+    Args:
+        path: URL path, optionally with a parameter suffix
+        
+    Returns:
+        Safe filename string
+    """
+    # Replace problematic characters
+    safe_name = _UNSAFE_FILENAME_RE.sub('_', path)
+    # Replace multiple underscores with single
+    safe_name = _UNDERSCORES_RE.sub('_', safe_name)
+    return safe_name.strip('_')
+
 
 class UtdanningAPIDownloader:
     """
@@ -79,6 +110,10 @@ class UtdanningAPIDownloader:
         
         # Parameter value cache
         self.parameter_values = {}
+        
+        # Optional queue notified with the path of every saved file, so
+        # downstream processing can start while downloads are still running
+        self.saved_files_queue: Optional[asyncio.Queue] = None
     
     def _setup_logging(self):
         """Setup logging configuration."""
@@ -107,7 +142,17 @@ class UtdanningAPIDownloader:
     
     async def __aenter__(self):
         """Async context manager entry."""
+        # One connection pool for every request in the run, so TLS sessions,
+        # keep-alive connections and DNS lookups for api.utdanning.no are reused
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
         self.session = aiohttp.ClientSession(
+            connector=connector,
             timeout=aiohttp.ClientTimeout(total=self.timeout)
         )
         return self
@@ -155,11 +200,7 @@ class UtdanningAPIDownloader:
             param_str = "_".join([f"{k}-{v}" for k, v in sorted(params.items())])
             path = f"{path}_{param_str}"
         
-        # Replace problematic characters
-        safe_name = re.sub(r'[<>:"/\\|?*{}]', '_', path)
-        # Replace multiple underscores with single
-        safe_name = re.sub(r'_+', '_', safe_name)
-        return safe_name.strip('_')
+        return _safe_filename(path)
     
     def _has_query_parameters_that_need_values(self, url: str) -> bool:
         """
@@ -553,16 +594,31 @@ class UtdanningAPIDownloader:
         Returns:
             Response data or None if failed
         """
+        data, _ = await self._make_sized_request(url, session)
+        return data
+    
+    async def _make_sized_request(self, url: str, session: aiohttp.ClientSession) -> Tuple[Optional[Dict], int]:
+        """
+        Make a single HTTP request with error handling, also reporting the body size.
+        
+        Args:
+            url: URL to request
+            session: aiohttp session
+            
+        Returns:
+            Tuple of (response data or None if failed, response body size in bytes)
+        """
         for attempt in range(self.retry_attempts):
             try:
                 self.stats["total_requests"] += 1
                 
                 async with session.get(url) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        body = await response.read()
+                        data = await response.json()  # Decodes the body read above
                         self.stats["successful_requests"] += 1
-                        self.stats["total_data_size"] += len(str(data))
-                        return data
+                        self.stats["total_data_size"] += len(body)
+                        return data, len(body)
                     elif response.status == 422:
                         # Log detailed 422 validation error with response body
                         try:
@@ -585,7 +641,7 @@ class UtdanningAPIDownloader:
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
         
         self.stats["failed_requests"] += 1
-        return None
+        return None, 0
     
     async def _save_data(self, data: Dict, filename: str) -> bool:
         """
@@ -600,8 +656,14 @@ class UtdanningAPIDownloader:
         """
         try:
             file_path = self.raw_data_dir / f"{filename}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Serialize in one call and write the bytes in one go
+            if orjson is not None:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            file_path.write_bytes(payload)
+            if self.saved_files_queue is not None:
+                self.saved_files_queue.put_nowait(file_path)
             return True
         except Exception as e:
             self.logger.error(f"Error saving {filename}: {e}")
@@ -660,12 +722,12 @@ class UtdanningAPIDownloader:
         """
         await asyncio.sleep(self.rate_limit)  # Rate limiting
         
-        data = await self._make_request(url, session)
+        data, data_size = await self._make_sized_request(url, session)
         if data is not None:
             filename = self._sanitize_filename(url)
             if await self._save_data(data, filename):
                 self.logger.info(f"Downloaded: {url}")
-                return {"success": True, "url": url, "filename": filename, "data_size": len(str(data))}
+                return {"success": True, "url": url, "filename": filename, "data_size": data_size}
         
         return {"success": False, "url": url, "reason": "Request failed"}
     
@@ -861,7 +923,7 @@ class UtdanningAPIDownloader:
                 
                 await asyncio.sleep(self.rate_limit)  # Rate limiting
                 
-                data = await self._make_request(parameterized_url, session)
+                data, data_size = await self._make_sized_request(parameterized_url, session)
                 if data is not None:
                     filename = self._sanitize_filename(url, params)
                     if await self._save_data(data, filename):
@@ -871,7 +933,7 @@ class UtdanningAPIDownloader:
                             "url": parameterized_url, 
                             "filename": filename,
                             "params": params,
-                            "data_size": len(str(data))
+                            "data_size": data_size
                         })
                     else:
                         results.append({
@@ -1020,7 +1082,7 @@ async def main():
         print(f"\nDownload Summary:")
         print(f"Successful: {summary['successful_downloads']}")
         print(f"Failed: {summary['failed_downloads']}")
-        print(f"Total data size: {summary['stats']['total_data_size']} characters")
+        print(f"Total data size: {summary['stats']['total_data_size']} bytes")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Shared aiohttp session for the utdanning.no API test scripts.
+Reuses connections and DNS lookups across every request made in one run.
+"""
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared client session, creating it on first use.
+
+    A session is tied to the event loop it was created on, so a new one is
+    made if the running loop has changed.
+
+    Returns:
+        Shared aiohttp client session
+    """
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=16,
+            ttl_dns_cache=600,
+            keepalive_timeout=30
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10, connect=2)
+        )
+        _session_loop = loop
+
+    return _session
+
+
+async def close_session():
+    """Close the shared client session if it is open."""
+    global _session, _session_loop
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
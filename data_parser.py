@@ -12,6 +12,40 @@ import logging
 import re
 from datetime import datetime
 import hashlib
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+
+# clean_text patterns, compiled once
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_DISALLOWED_CHARS_RE = re.compile(r'[^\w\s\.,!?;:()\-æøåÆØÅ""''–—/%]')
+
+# Most recent distinct records whose extraction results are kept
+EXTRACT_CACHE_SIZE = 1024
+
+
+def _load_json(path: Path) -> Any:
+    """Read JSON from path, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(obj: Any, path: Path):
+    """Write obj to path as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
 
 
 class UtdanningDataParser:
@@ -19,7 +53,8 @@ class UtdanningDataParser:
     Parses and cleans downloaded API data for LLM processing.
     """
     
-    def __init__(self, raw_data_dir: str, processed_data_dir: str, logger: Optional[logging.Logger] = None):
+    def __init__(self, raw_data_dir: str, processed_data_dir: str, logger: Optional[logging.Logger] = None,
+                 use_cache: bool = True):
         """
         Initialize the data parser.
         
@@ -27,10 +62,16 @@ class UtdanningDataParser:
             raw_data_dir: Directory containing raw JSON files
             processed_data_dir: Directory for processed output
             logger: Logger instance
+            use_cache: Reuse text/metadata extraction for records with identical content
         """
         self.raw_data_dir = Path(raw_data_dir)
         self.processed_data_dir = Path(processed_data_dir)
         self.logger = logger or logging.getLogger(__name__)
+        self.use_cache = use_cache
+        
+        # Content hash -> (text chunks, metadata) for recently extracted records,
+        # least recently used first; capped at EXTRACT_CACHE_SIZE entries
+        self._extract_cache: "OrderedDict[bytes, Tuple[List[Dict[str, str]], Dict[str, Any]]]" = OrderedDict()
         
         # Create output directories
         self.processed_data_dir.mkdir(parents=True, exist_ok=True)
@@ -43,7 +84,9 @@ class UtdanningDataParser:
             "files_processed": 0,
             "records_extracted": 0,
             "text_chunks_created": 0,
-            "errors": 0
+            "errors": 0,
+            "extract_cache_hits": 0,
+            "extract_cache_misses": 0
         }
         
         # Text extraction patterns
@@ -79,14 +122,14 @@ class UtdanningDataParser:
             text = text.decode('utf-8', errors='ignore')
         
         # Remove HTML tags but preserve Norwegian characters
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _HTML_TAG_RE.sub('', text)
         
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Keep Norwegian characters (æøå ÆØÅ) and common punctuation
         # Remove only problematic characters, not Norwegian ones
-        text = re.sub(r'[^\w\s\.,!?;:()\-æøåÆØÅ""''–—/%]', '', text)
+        text = _DISALLOWED_CHARS_RE.sub('', text)
         
         # Fix common Norwegian encoding issues from API responses
         encoding_fixes = {
@@ -179,6 +222,36 @@ class UtdanningDataParser:
         recursive_metadata_extract(data)
         return metadata
     
+    def _extract_cached(self, data: Any, canonical: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Extract text chunks and metadata, reusing results for identical content.
+        
+        Args:
+            data: JSON data to process
+            canonical: data serialized with sorted keys
+            
+        Returns:
+            Tuple of (text chunks, metadata)
+        """
+        if not self.use_cache:
+            return self.extract_text_content(data), self.extract_metadata(data)
+        
+        key = hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+        cached = self._extract_cache.get(key)
+        if cached is not None:
+            self.stats["extract_cache_hits"] += 1
+            self._extract_cache.move_to_end(key)
+        else:
+            self.stats["extract_cache_misses"] += 1
+            cached = (self.extract_text_content(data), self.extract_metadata(data))
+            self._extract_cache[key] = cached
+            if len(self._extract_cache) > EXTRACT_CACHE_SIZE:
+                self._extract_cache.popitem(last=False)
+        
+        # Copies, so records never share mutable containers
+        text_chunks, metadata = cached
+        return [dict(chunk) for chunk in text_chunks], dict(metadata)
+    
     def normalize_record(self, data: Dict[str, Any], source_file: str) -> Dict[str, Any]:
         """
         Normalize a single record.
@@ -190,12 +263,14 @@ class UtdanningDataParser:
         Returns:
             Normalized record
         """
+        # Serialize once; used for both the extraction cache key and the record ID
+        canonical = json.dumps(data, sort_keys=True)
+        
         # Extract components
-        text_chunks = self.extract_text_content(data)
-        metadata = self.extract_metadata(data)
+        text_chunks, metadata = self._extract_cached(data, canonical)
         
         # Create a record ID
-        record_id = hashlib.md5(f"{source_file}_{json.dumps(data, sort_keys=True)}".encode()).hexdigest()[:16]
+        record_id = hashlib.md5(f"{source_file}_{canonical}".encode()).hexdigest()[:16]
         
         # Combine all text into a single content field
         combined_text = " ".join([chunk["text"] for chunk in text_chunks])
@@ -225,8 +300,7 @@ class UtdanningDataParser:
             List of normalized records
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            raw_data = _load_json(file_path)
             
             records = []
             source_file = file_path.stem
@@ -260,6 +334,47 @@ class UtdanningDataParser:
             self.stats["errors"] += 1
             return []
     
+    def iter_raw_files(self):
+        """
+        Iterate over the raw JSON files that should be processed.
+        
+        Yields:
+            Paths of raw data files (summary files are skipped)
+        """
+        for json_file in self.raw_data_dir.glob("*.json"):
+            if json_file.name.endswith("_summary.json"):
+                continue  # Skip summary files
+            yield json_file
+    
+    def process_and_save_file(self, json_file: Path) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Process a single raw file and save its normalized records.
+        
+        Args:
+            json_file: Path to raw JSON file
+            
+        Returns:
+            Tuple of (records, file summary), or None if the file yielded no records
+        """
+        self.logger.info(f"Processing: {json_file.name}")
+        records = self.process_json_file(json_file)
+        
+        if not records:
+            return None
+        
+        # Save individual processed file
+        output_file = self.processed_data_dir / "normalized" / f"{json_file.stem}_normalized.json"
+        _dump_json(records, output_file)
+        
+        file_summary = {
+            "source_file": json_file.name,
+            "records_count": len(records),
+            "total_text_length": sum(r["content_length"] for r in records),
+            "output_file": output_file.name
+        }
+        
+        return records, file_summary
+    
     def process_all_files(self) -> Dict[str, Any]:
         """
         Process all JSON files in the raw data directory.
@@ -269,37 +384,35 @@ class UtdanningDataParser:
         """
         self.logger.info("Starting data processing...")
         
+        # Process each JSON file
+        file_results = [self.process_and_save_file(json_file) for json_file in self.iter_raw_files()]
+        
+        return self.write_combined_outputs(file_results)
+    
+    def write_combined_outputs(self, file_results: List[Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]]) -> Dict[str, Any]:
+        """
+        Combine per-file results and write the combined dataset and summaries.
+        
+        Args:
+            file_results: Results of process_and_save_file, one per raw file
+            
+        Returns:
+            Processing summary
+        """
         all_records = []
         file_summaries = []
         
-        # Process each JSON file
-        for json_file in self.raw_data_dir.glob("*.json"):
-            if json_file.name.endswith("_summary.json"):
-                continue  # Skip summary files
-            
-            self.logger.info(f"Processing: {json_file.name}")
-            records = self.process_json_file(json_file)
-            
-            if records:
-                all_records.extend(records)
-                
-                # Save individual processed file
-                output_file = self.processed_data_dir / "normalized" / f"{json_file.stem}_normalized.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(records, f, ensure_ascii=False, indent=2)
-                
-                file_summaries.append({
-                    "source_file": json_file.name,
-                    "records_count": len(records),
-                    "total_text_length": sum(r["content_length"] for r in records),
-                    "output_file": output_file.name
-                })
+        for result in file_results:
+            if result is None:
+                continue
+            records, file_summary = result
+            all_records.extend(records)
+            file_summaries.append(file_summary)
         
         # Save combined dataset
         if all_records:
             combined_file = self.processed_data_dir / "all_records_normalized.json"
-            with open(combined_file, 'w', encoding='utf-8') as f:
-                json.dump(all_records, f, ensure_ascii=False, indent=2)
+            _dump_json(all_records, combined_file)
             
             # Create a pandas DataFrame for analysis
             df_records = []
@@ -335,10 +448,12 @@ class UtdanningDataParser:
         }
         
         # Save summary
-        with open(self.processed_data_dir / "processing_summary.json", 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        _dump_json(summary, self.processed_data_dir / "processing_summary.json")
         
         self.logger.info(f"Processing complete: {len(all_records)} records from {self.stats['files_processed']} files")
+        if self.use_cache:
+            self.logger.info(f"Extraction cache: {self.stats['extract_cache_hits']} hits, "
+                             f"{self.stats['extract_cache_misses']} misses")
         
         return summary
     
@@ -358,8 +473,7 @@ class UtdanningDataParser:
             self.logger.error("No normalized data found. Run process_all_files() first.")
             return []
         
-        with open(combined_file, 'r', encoding='utf-8') as f:
-            records = json.load(f)
+        records = _load_json(combined_file)
         
         chunks = []
         chunk_id = 0
@@ -410,8 +524,7 @@ class UtdanningDataParser:
         
         # Save chunks
         chunks_file = self.processed_data_dir / "text_content" / "vectorization_chunks.json"
-        with open(chunks_file, 'w', encoding='utf-8') as f:
-            json.dump(chunks, f, ensure_ascii=False, indent=2)
+        _dump_json(chunks, chunks_file)
         
         # Also save as CSV for easy analysis
         chunks_df = pd.DataFrame(chunks)
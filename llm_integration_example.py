@@ -3,16 +3,13 @@ Example: Integrating Utdanning.no Data with Online LLM Models
 Demonstrates how to use the processed educational data with popular LLM APIs.
 """
 
-import json
-import openai
-import pandas as pd
+import orjson
 from pathlib import Path
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import asyncio
-import aiohttp
-from sentence_transformers import SentenceTransformer
+import functools
 import os
 from dotenv import load_dotenv
 
@@ -36,14 +33,44 @@ class UtdanningLLMIntegration:
         self.embeddings_cache = {}
         self.documents = []
         self.embeddings = None
+        self.index = None
+        
+        # Text previews by document id, kept apart from the documents themselves
+        self._previews = {}
+        
+        # Per-instance LRU cache of local query embeddings
+        self._embed_query = functools.lru_cache(maxsize=1024)(self._encode_query)
         
         # Initialize embedding model for local processing
+        # Use Norwegian-compatible multilingual model
+        model_name = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+        self.device = "cpu"
         try:
-            # Use Norwegian-compatible multilingual model
-            self.embedding_model = SentenceTransformer(
-                'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
-            )
-            print("✅ Loaded local embedding model")
+            # Heavy imports (torch + transformers) are deferred to here
+            import torch
+            from sentence_transformers import SentenceTransformer
+            
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.embedding_model = None
+            if self.device == "cpu":
+                # The quantized ONNX export targets CPU; prefer it when the
+                # ONNX Runtime backend is installed (sentence-transformers[onnx])
+                try:
+                    self.embedding_model = SentenceTransformer(
+                        model_name,
+                        backend="onnx",
+                        model_kwargs={"file_name": "onnx/model_qint8_avx512.onnx"}
+                    )
+                    print("✅ Loaded local embedding model (ONNX int8)")
+                except Exception:
+                    pass
+            
+            if self.embedding_model is None:
+                # Fall back to PyTorch, using all CPU cores when not on GPU
+                if self.device == "cpu":
+                    torch.set_num_threads(os.cpu_count() or 1)
+                self.embedding_model = SentenceTransformer(model_name, device=self.device)
+                print(f"✅ Loaded local embedding model ({self.device})")
         except Exception as e:
             print(f"⚠️  Could not load local embedding model: {e}")
             self.embedding_model = None
@@ -64,8 +91,8 @@ class UtdanningLLMIntegration:
                 "Please run the main pipeline first: python main.py"
             )
         
-        with open(vector_file, 'r', encoding='utf-8') as f:
-            self.documents = json.load(f)
+        self.documents = orjson.loads(vector_file.read_bytes())
+        self._previews.clear()
         
         print(f"📚 Loaded {len(self.documents)} documents from processed data")
         
@@ -73,14 +100,21 @@ class UtdanningLLMIntegration:
         analysis_file = self.data_dir / "text_for_llm" / "dataset_analysis.json"
         analysis = {}
         if analysis_file.exists():
-            with open(analysis_file, 'r', encoding='utf-8') as f:
-                analysis = json.load(f)
+            analysis = orjson.loads(analysis_file.read_bytes())
+        
+        count = len(self.documents)
+        content_lengths = np.fromiter(
+            (doc["content_length"] for doc in self.documents), dtype=np.int64, count=count
+        )
+        relevance = np.fromiter(
+            (doc.get("educational_relevance", 0) for doc in self.documents), dtype=np.float32, count=count
+        )
         
         return {
-            "total_documents": len(self.documents),
+            "total_documents": count,
             "document_types": analysis.get("document_types", {}),
-            "avg_length": np.mean([doc["content_length"] for doc in self.documents]),
-            "high_relevance_docs": sum(1 for doc in self.documents if doc.get("educational_relevance", 0) > 0.7)
+            "avg_length": float(content_lengths.mean()) if count else float("nan"),
+            "high_relevance_docs": int((relevance > 0.7).sum())
         }
     
     def create_local_embeddings(self, force_refresh: bool = False) -> np.ndarray:
@@ -96,47 +130,63 @@ class UtdanningLLMIntegration:
         if not self.embedding_model:
             raise ValueError("Local embedding model not available")
         
-        embeddings_file = self.data_dir / "text_for_llm" / "local_embeddings.npy"
+        # Versioned name: v2 caches hold L2-normalized vectors (ranked by plain
+        # dot product); older local_embeddings.npy files are not normalized
+        embeddings_file = self.data_dir / "text_for_llm" / "local_embeddings_v2.npy"
         
         # Load cached embeddings if available
         if embeddings_file.exists() and not force_refresh:
             print("📁 Loading cached embeddings...")
-            self.embeddings = np.load(embeddings_file)
+            # Stored as float16; numpy has no BLAS kernel for float16, so
+            # search runs on a float32 copy
+            self.embeddings = np.load(embeddings_file).astype(np.float32)
+            self._build_index()
             return self.embeddings
         
         print("🔄 Creating new embeddings (this may take a few minutes)...")
         
-        # Extract texts for embedding
-        texts = []
-        for doc in self.documents:
-            # Use title + text for better context
-            combined_text = f"{doc['title']}\n\n{doc['text']}"
-            texts.append(combined_text)
+        # Use title + text for better context
+        texts = [f"{doc['title']}\n\n{doc['text']}" for doc in self.documents]
         
-        # Create embeddings in batches to avoid memory issues
-        batch_size = 32
-        all_embeddings = []
+        # A single encode call lets SBERT length-sort and batch internally
+        # (results come back in input order) behind one progress bar
+        import torch
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = self.embedding_model.encode(
-                batch, 
+        with torch.inference_mode():
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=128,
                 show_progress_bar=True,
-                convert_to_numpy=True
+                convert_to_numpy=True,
+                normalize_embeddings=True
             )
-            all_embeddings.append(batch_embeddings)
-            print(f"Processed batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
         
-        # Combine all embeddings
-        self.embeddings = np.vstack(all_embeddings)
+        # Search on float32 (numpy's float16 matmul has no BLAS kernel and is
+        # far slower); only the cache on disk is stored as float16
+        self.embeddings = embeddings.astype(np.float32, copy=False)
         
         # Cache embeddings
-        np.save(embeddings_file, self.embeddings)
+        np.save(embeddings_file, self.embeddings.astype(np.float16))
         print(f"💾 Cached embeddings to {embeddings_file}")
         
+        self._build_index()
         return self.embeddings
     
-    async def create_openai_embeddings(self, api_key: str, force_refresh: bool = False) -> List[List[float]]:
+    def _build_index(self) -> None:
+        """Build a FAISS inner-product index over the (normalized) local embeddings."""
+        self.index = None
+        if self.embeddings is None:
+            return
+        
+        try:
+            import faiss
+        except ImportError:
+            return
+        
+        self.index = faiss.IndexFlatIP(self.embeddings.shape[1])
+        self.index.add(np.ascontiguousarray(self.embeddings, dtype=np.float32))
+    
+    async def create_openai_embeddings(self, api_key: str, force_refresh: bool = False) -> np.ndarray:
         """
         Create embeddings using OpenAI API (requires API key, costs money).
         
@@ -145,61 +195,86 @@ class UtdanningLLMIntegration:
             force_refresh: Force recreation of embeddings
             
         Returns:
-            List of embedding vectors
+            Numpy array of embeddings
         """
-        embeddings_file = self.data_dir / "text_for_llm" / "openai_embeddings.json"
+        embeddings_file = self.data_dir / "text_for_llm" / "openai_embeddings.npy"
+        metadata_file = self.data_dir / "text_for_llm" / "openai_embeddings_meta.json"
         
         # Load cached embeddings if available
         if embeddings_file.exists() and not force_refresh:
             print("📁 Loading cached OpenAI embeddings...")
-            with open(embeddings_file, 'r') as f:
-                cached = json.load(f)
-            return cached['embeddings']
+            return np.load(embeddings_file).astype(np.float32)
         
         print("🔄 Creating OpenAI embeddings...")
         
-        openai.api_key = api_key
+        import openai
+        
+        client = openai.AsyncOpenAI(api_key=api_key)
         
         # Extract texts
         texts = [f"{doc['title']}\n\n{doc['text'][:8000]}" for doc in self.documents]  # Limit length for API
         
-        # Create embeddings in batches
+        # Create embeddings in batches, with a bounded number in flight
         batch_size = 100  # OpenAI rate limits
-        all_embeddings = []
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        semaphore = asyncio.Semaphore(8)
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            
-            try:
-                response = await openai.Embedding.acreate(
+        async def embed_batch(batch_number: int, batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await client.embeddings.create(
                     input=batch,
                     model="text-embedding-ada-002"
                 )
-                
-                batch_embeddings = [item['embedding'] for item in response['data']]
-                all_embeddings.extend(batch_embeddings)
-                
-                print(f"Processed batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
-                
-            except Exception as e:
-                print(f"Error creating embeddings for batch {i}: {e}")
-                # Create dummy embeddings as fallback
-                dummy_embeddings = [[0.0] * 1536] * len(batch)
-                all_embeddings.extend(dummy_embeddings)
+            print(f"Processed batch {batch_number + 1}/{len(batches)}")
+            return [item.embedding for item in response.data]
         
-        # Cache embeddings
-        cache_data = {
-            'embeddings': all_embeddings,
-            'model': 'text-embedding-ada-002',
-            'created_at': pd.Timestamp.now().isoformat()
-        }
+        results = await asyncio.gather(
+            *(embed_batch(n, batch) for n, batch in enumerate(batches)),
+            return_exceptions=True
+        )
         
-        with open(embeddings_file, 'w') as f:
-            json.dump(cache_data, f)
+        # Flatten in original order
+        all_embeddings = []
+        for n, (batch, result) in enumerate(zip(batches, results)):
+            if isinstance(result, Exception):
+                print(f"Error creating embeddings for batch {n * batch_size}: {result}")
+                # Create dummy embeddings as fallback
+                all_embeddings.extend([[0.0] * 1536] * len(batch))
+            else:
+                all_embeddings.extend(result)
+        
+        # Cache embeddings as a float16 matrix instead of JSON text
+        embeddings = np.asarray(all_embeddings, dtype=np.float32)
+        np.save(embeddings_file, embeddings.astype(np.float16))
+        metadata_file.write_bytes(orjson.dumps({
+            'model': 'text-embedding-ada-002',
+            'created_at': datetime.now().isoformat()
+        }))
         
         print(f"💾 Cached OpenAI embeddings to {embeddings_file}")
         
-        return all_embeddings
+        return embeddings
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a single query with the local model.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Read-only, L2-normalized float32 query vector
+        """
+        if not self.embedding_model:
+            raise ValueError("Local embedding model not available")
+        
+        query_vector = self.embedding_model.encode(
+            [query],
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )[0].astype(np.float32)
+        query_vector.setflags(write=False)
+        return query_vector
     
     def semantic_search(self, query: str, top_k: int = 5, use_openai: bool = False) -> List[Dict[str, Any]]:
         """
@@ -217,24 +292,50 @@ class UtdanningLLMIntegration:
             raise ValueError("No embeddings available. Create embeddings first.")
         
         # Create query embedding
-        if use_openai and os.getenv('OPENAI_API_KEY'):
+        use_openai = use_openai and bool(os.getenv('OPENAI_API_KEY'))
+        if use_openai:
             # Use OpenAI for query embedding (more expensive but potentially better)
-            response = openai.Embedding.create(
+            import openai
+            
+            response = openai.OpenAI().embeddings.create(
                 input=[query],
                 model="text-embedding-ada-002"
             )
-            query_embedding = np.array(response['data'][0]['embedding']).reshape(1, -1)
+            query_vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+            
+            # Stored embeddings are L2-normalized, so only the query needs
+            # normalizing and cosine similarity reduces to a dot product
+            norm = np.linalg.norm(query_vector)
+            if norm > 0:
+                query_vector = query_vector / norm
         else:
-            # Use local model
-            if not self.embedding_model:
-                raise ValueError("Local embedding model not available")
-            query_embedding = self.embedding_model.encode([query])
+            # Use local model (cached per query string)
+            query_vector = self._embed_query(query)
+        
+        # The FAISS index covers the local embeddings only
+        if self.index is not None and not use_openai:
+            k = min(top_k, self.index.ntotal)
+            if k <= 0:
+                return []
+            scores, indices = self.index.search(np.array(query_vector, ndmin=2), k)
+            return [
+                {
+                    'document': self.documents[idx],
+                    'similarity': float(score),
+                    'rank': rank
+                }
+                for rank, (idx, score) in enumerate(zip(indices[0], scores[0]), 1)
+            ]
         
         # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+        similarities = self.embeddings @ query_vector
         
-        # Get top results
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        # Get top results (partition first, then sort only the top_k)
+        k = min(top_k, similarities.shape[0])
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = candidates[np.argsort(-similarities[candidates])]
         
         results = []
         for idx in top_indices:
@@ -247,6 +348,79 @@ class UtdanningLLMIntegration:
         
         return results
     
+    def semantic_search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Perform semantic search for several queries with a single matrix product.
+        
+        Args:
+            queries: Search queries in Norwegian or English
+            top_k: Number of results to return per query
+            
+        Returns:
+            One list of most relevant documents per query
+        """
+        if self.embeddings is None:
+            raise ValueError("No embeddings available. Create embeddings first.")
+        if not self.embedding_model:
+            raise ValueError("Local embedding model not available")
+        if not queries:
+            return []
+        
+        # Encode all queries in one call (already L2-normalized)
+        query_matrix = self.embedding_model.encode(
+            queries,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        
+        if self.index is not None:
+            k = min(top_k, self.index.ntotal)
+            if k <= 0:
+                return [[] for _ in queries]
+            scores, indices = self.index.search(np.ascontiguousarray(query_matrix, dtype=np.float32), k)
+            return [
+                [
+                    {
+                        'document': self.documents[idx],
+                        'similarity': float(score),
+                        'rank': rank
+                    }
+                    for rank, (idx, score) in enumerate(zip(row_indices, row_scores), 1)
+                ]
+                for row_indices, row_scores in zip(indices, scores)
+            ]
+        
+        query_matrix = query_matrix.astype(np.float32, copy=False)
+        
+        # (Q, D) @ (D, N) -> (Q, N) similarity matrix
+        similarity_matrix = query_matrix @ self.embeddings.T
+        
+        k = min(top_k, similarity_matrix.shape[1])
+        if k <= 0:
+            return [[] for _ in queries]
+        candidates = np.argpartition(-similarity_matrix, k - 1, axis=1)[:, :k]
+        
+        all_results = []
+        for row, row_candidates in zip(similarity_matrix, candidates):
+            top_indices = row_candidates[np.argsort(-row[row_candidates])]
+            all_results.append([
+                {
+                    'document': self.documents[idx],
+                    'similarity': float(row[idx]),
+                    'rank': rank
+                }
+                for rank, idx in enumerate(top_indices, 1)
+            ])
+        
+        return all_results
+    
+    def _preview(self, doc: Dict[str, Any]) -> str:
+        """Return a short text preview for a document, memoized by document id."""
+        preview = self._previews.get(doc['id'])
+        if preview is None:
+            preview = self._previews[doc['id']] = f"{doc['text'][:200]}..."
+        return preview
+    
     async def generate_answer_with_gpt(self, question: str, context_docs: List[Dict], api_key: str) -> str:
         """
         Generate an answer using GPT with educational context.
@@ -259,7 +433,9 @@ class UtdanningLLMIntegration:
         Returns:
             Generated answer
         """
-        openai.api_key = api_key
+        import openai
+        
+        client = openai.AsyncOpenAI(api_key=api_key)
         
         # Prepare context from documents
         context_parts = []
@@ -287,7 +463,7 @@ Svar på norsk med følgende struktur:
 Svar:"""
         
         try:
-            response = await openai.ChatCompletion.acreate(
+            response = await client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "Du er en hjelpsom assistent som spesialiserer seg på norsk utdanning og karriereveiledning."},
@@ -333,7 +509,7 @@ Svar:"""
                 'source_endpoint': doc.get('source_endpoint', 'ukjent'),
                 'relevance_score': result['similarity'],
                 'educational_relevance': doc.get('educational_relevance', 0),
-                'preview': doc['text'][:200] + "..."
+                'preview': self._preview(doc)
             })
         
         # Generate answer with GPT if requested
@@ -375,9 +551,10 @@ async def example_basic_search():
         "Programmering og IT-utdanning"
     ]
     
-    for query in queries:
+    all_results = integration.semantic_search_batch(queries, top_k=3)
+    
+    for query, results in zip(queries, all_results):
         print(f"\n🔍 Søk: {query}")
-        results = integration.semantic_search(query, top_k=3)
         
         for i, result in enumerate(results, 1):
             doc = result['document']
@@ -454,26 +631,23 @@ def example_data_export():
     output_dir = Path("exports")
     output_dir.mkdir(exist_ok=True)
     
-    # JSON export
-    with open(output_dir / "high_relevance_education_data.json", 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, ensure_ascii=False, indent=2)
+    # Parquet export (columnar, zstd-compressed) as the primary format
+    import pandas as pd
     
-    # CSV export
     df = pd.DataFrame(export_data)
-    df.to_csv(output_dir / "high_relevance_education_data.csv", index=False, encoding='utf-8')
+    df.to_parquet(
+        output_dir / "high_relevance_education_data.parquet",
+        compression="zstd",
+        engine="pyarrow",
+        index=False
+    )
     
-    # Simple text export for basic LLM training
-    with open(output_dir / "education_texts.txt", 'w', encoding='utf-8') as f:
-        for doc in export_data:
-            f.write(f"Title: {doc['title']}\n")
-            f.write(f"Source: {doc['source']}\n")
-            f.write(f"Text: {doc['text']}\n")
-            f.write("=" * 80 + "\n\n")
+    # Compact JSON export for interchange
+    (output_dir / "high_relevance_education_data.json").write_bytes(orjson.dumps(export_data))
     
     print(f"✅ Exported data to {output_dir}/")
+    print(f"   - Parquet format: high_relevance_education_data.parquet")
     print(f"   - JSON format: high_relevance_education_data.json")
-    print(f"   - CSV format: high_relevance_education_data.csv")
-    print(f"   - Text format: education_texts.txt")
 
 
 async def main():
@@ -4,23 +4,223 @@ Main Execution Script for Utdanning.no API Data Pipeline
 Orchestrates the complete download, processing, and vectorization preparation pipeline.
 
 Usage:
-    python main.py [--download-only] [--process-only] [--extract-only] [--output-dir OUTPUT_DIR]
+    python main.py [--download-only] [--process-only] [--extract-only] [--resume] [--output-dir OUTPUT_DIR]
 """
 
 import asyncio
 import argparse
+import atexit
+import functools
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
 import time
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 import json
 import sys
 
-# Import our custom modules
-from api_downloader import UtdanningAPIDownloader
-from url_processor import URLProcessor, download_with_parameterized_support
-from data_parser import UtdanningDataParser
-from text_extractor import TextExtractor
+# Pipeline modules are imported inside the phases that need them, so a
+# single phase never pays for aiohttp, pandas or the embedding stack it
+# does not use
+if TYPE_CHECKING:
+    from data_parser import UtdanningDataParser
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj (dataclasses included) to indented UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=asdict).encode('utf-8')
+
+
+def _dump(obj: Any, path: Path):
+    """Write obj to path as indented UTF-8 JSON."""
+    path.write_bytes(_dumps(obj))
+
+
+def _load(path: Path) -> Any:
+    """Read JSON from path."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StreamingJSONDict:
+    """
+    Write a JSON object to disk one field at a time.
+    
+    Each field is serialized and flushed as soon as it is written, so large
+    sub-objects never have to be serialized together and the fields written
+    so far survive a crash later in the run.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Initialize the writer.
+        
+        Args:
+            path: Output JSON file
+        """
+        self.path = Path(path)
+        self._file = None
+        self.written: List[str] = []
+    
+    def __enter__(self) -> "StreamingJSONDict":
+        self._file = open(self.path, 'wb')
+        self._file.write(b'{')
+        return self
+    
+    def write_field(self, name: str, obj: Any):
+        """
+        Write one key/value pair of the object.
+        
+        Args:
+            name: Field name
+            obj: JSON-serializable value
+        """
+        # Serialize before writing, so a failure never leaves half a field
+        data = (b',\n' if self.written else b'\n') + _dumps(name) + b': ' + _dumps(obj)
+        self._file.write(data)
+        self._file.flush()
+        self.written.append(name)
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._file.write(b'\n}\n')
+        self._file.close()
+        return False
+
+
+# slots=True is only accepted by dataclass on Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class PipelineStats:
+    """Statistics collected over a pipeline run."""
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    duration_seconds: float = 0
+    phases_completed: List[str] = field(default_factory=list)
+    total_files_downloaded: int = 0
+    total_records_processed: int = 0
+    total_documents_created: int = 0
+    errors: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+# Marker file (in the output directory) holding the last completed phase
+PIPELINE_MARKER = ".pipeline_done"
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Fewest raw files worth starting worker processes for
+PARSE_POOL_MIN_FILES = 50
+
+
+class _LogCollector(logging.Handler):
+    """Keep the log records of a worker process for the parent to log."""
+    
+    def __init__(self):
+        super().__init__()
+        self.lines: List[Tuple[int, str]] = []
+    
+    def emit(self, record: logging.LogRecord):
+        self.lines.append((record.levelno, record.getMessage()))
+
+
+# Parser and log collector reused by every file a worker process handles
+_worker_parser = None
+_worker_log = None
+
+
+def _parse_one(json_file: Path, raw_data_dir: str, processed_data_dir: str,
+               use_cache: bool = True) -> Tuple[Any, Dict[str, int], List[Tuple[int, str]]]:
+    """
+    Parse a single raw file inside a worker process.
+    
+    Args:
+        json_file: Path to raw JSON file
+        raw_data_dir: Directory containing raw JSON files
+        processed_data_dir: Directory for processed output
+        use_cache: Reuse extraction results for records with identical content
+        
+    Returns:
+        Tuple of (process_and_save_file result, parser statistics for this
+        file, (level, message) log lines for this file)
+    """
+    global _worker_parser, _worker_log
+    if _worker_parser is None:
+        from data_parser import UtdanningDataParser
+        
+        # Worker processes have no log handlers of their own, so their log
+        # lines are collected and logged by the parent through its logger
+        _worker_log = _LogCollector()
+        logger = logging.getLogger('UtdanningPipeline.worker')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(_worker_log)
+        
+        _worker_parser = UtdanningDataParser(raw_data_dir, processed_data_dir, logger=logger,
+                                             use_cache=use_cache)
+    
+    _worker_parser.stats = dict.fromkeys(_worker_parser.stats, 0)
+    _worker_log.lines = []
+    result = _worker_parser.process_and_save_file(json_file)
+    return result, _worker_parser.stats, _worker_log.lines
+
+
+def _make_dirs(dirs: List[Path]):
+    """
+    Create directories and their parents, visiting each path component once.
+    
+    Args:
+        dirs: Directories to create
+    """
+    needed = sorted({p for d in dirs for p in (d, *d.parents)}, key=lambda p: len(p.parts))
+    for p in needed:
+        try:
+            os.mkdir(p)
+        except FileExistsError:
+            pass
+
+
+def _first_n_files(dir_path: Path, suffix: str, n: Optional[int] = 10) -> List[str]:
+    """
+    List file names in a directory without materializing the whole listing.
+    
+    Args:
+        dir_path: Directory to scan
+        suffix: File name suffix to match
+        n: Maximum number of names to return (None for all)
+        
+    Returns:
+        Matching file names in directory order
+    """
+    out = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False):
+                out.append(entry.name)
+                if n is not None and len(out) >= n:
+                    break
+    return out
 
 
 class UtdanningDataPipeline:
@@ -44,35 +244,28 @@ class UtdanningDataPipeline:
         self.processed_data_dir = self.output_dir / "processed"
         self.logs_dir = self.output_dir / "logs"
         
-        for dir_path in [self.raw_data_dir, self.processed_data_dir, self.logs_dir]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        _make_dirs([self.raw_data_dir, self.processed_data_dir, self.logs_dir])
+        
+        # Cached output structure summary, keyed by directory mtimes
+        self._output_struct_cache = None
         
         # Setup logging
         self._setup_logging()
         
         # Pipeline statistics
-        self.pipeline_stats = {
-            "start_time": None,
-            "end_time": None,
-            "duration_seconds": 0,
-            "phases_completed": [],
-            "total_files_downloaded": 0,
-            "total_records_processed": 0,
-            "total_documents_created": 0,
-            "errors": []
-        }
+        self.pipeline_stats = PipelineStats()
     
     def _setup_logging(self):
         """Setup comprehensive logging."""
         log_file = self.logs_dir / f"pipeline_{int(time.time())}.log"
         
         # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        formatter = logging.Formatter(LOG_FORMAT)
         
-        # File handler
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # File handler (rotated to bound log growth)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=50 * 1024 ** 2, backupCount=5, encoding='utf-8', delay=True
+        )
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(formatter)
         
@@ -81,21 +274,30 @@ class UtdanningDataPipeline:
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
         
+        # Write records from a background thread so logging never blocks the phases
+        log_queue = queue.Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+        
         # Setup root logger
         self.logger = logging.getLogger('UtdanningPipeline')
         self.logger.setLevel(logging.INFO)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self._queue_handler = logging.handlers.QueueHandler(log_queue)
+        self.logger.addHandler(self._queue_handler)
         
-        self.logger.info(f"Pipeline initialized. Output directory: {self.output_dir}")
-        self.logger.info(f"Log file: {log_file}")
+        self.logger.info("Pipeline initialized. Output directory: %s", self.output_dir)
+        self.logger.info("Log file: %s", log_file)
     
-    async def run_download_phase(self, url_list_file: str) -> Dict[str, Any]:
+    async def run_download_phase(self, url_list_file: str, saved_files_queue: Optional[asyncio.Queue] = None) -> Dict[str, Any]:
         """
         Run the data download phase.
         
         Args:
             url_list_file: Path to URL list JSON file
+            saved_files_queue: Optional queue that receives the path of each saved file
             
         Returns:
             Download phase summary
@@ -104,27 +306,36 @@ class UtdanningDataPipeline:
         self.logger.info("PHASE 1: DATA DOWNLOAD")
         self.logger.info("=" * 60)
         
+        from url_processor import download_with_parameterized_support
+        
         try:
             # Use the complete download function with parameterized support
             summary = await download_with_parameterized_support(
                 url_list_file=url_list_file,
-                output_dir=str(self.output_dir)
+                output_dir=str(self.output_dir),
+                saved_files_queue=saved_files_queue,
+                downloader_config=self.config.get("downloader")
             )
             
-            self.pipeline_stats["phases_completed"].append("download")
-            self.pipeline_stats["total_files_downloaded"] = summary.get("total_successful", 0)
+            self.pipeline_stats.phases_completed.append("download")
+            self._mark_stage_done("download")
+            self.pipeline_stats.total_files_downloaded = summary.get("total_successful", 0)
             
-            self.logger.info(f"Download phase completed successfully")
-            self.logger.info(f"Files downloaded: {self.pipeline_stats['total_files_downloaded']}")
+            self.logger.info("Download phase completed successfully")
+            self.logger.info("Files downloaded: %d", self.pipeline_stats.total_files_downloaded)
             
             return summary
             
         except Exception as e:
             error_msg = f"Download phase failed: {e}"
             self.logger.error(error_msg)
-            self.pipeline_stats["errors"].append(error_msg)
+            self.pipeline_stats.errors.append(error_msg)
             raise
     
+    def _parser_cache_enabled(self) -> bool:
+        """Whether the parser may reuse extraction results for identical records."""
+        return self.config.get("parser", {}).get("cache", True)
+    
     def run_processing_phase(self) -> Dict[str, Any]:
         """
         Run the data processing phase.
@@ -136,33 +347,233 @@ class UtdanningDataPipeline:
         self.logger.info("PHASE 2: DATA PROCESSING")
         self.logger.info("=" * 60)
         
+        from data_parser import UtdanningDataParser
+        
         try:
             parser = UtdanningDataParser(
                 raw_data_dir=str(self.raw_data_dir),
                 processed_data_dir=str(self.processed_data_dir),
-                logger=self.logger
+                logger=self.logger,
+                use_cache=self._parser_cache_enabled()
             )
             
-            summary = parser.process_all_files()
+            self.logger.info("Starting data processing...")
+            raw_files = list(parser.iter_raw_files())
             
-            self.pipeline_stats["phases_completed"].append("processing")
-            self.pipeline_stats["total_records_processed"] = summary.get("total_records", 0)
+            if len(raw_files) < PARSE_POOL_MIN_FILES:
+                # Too few files to be worth the process start-up cost
+                file_results = [parser.process_and_save_file(json_file) for json_file in raw_files]
+            else:
+                # Files are independent, so parse them across processes
+                workers = os.cpu_count() or 1
+                self.logger.info("Parsing %d raw files with %d worker processes", len(raw_files), workers)
+                
+                parse = functools.partial(
+                    _parse_one,
+                    raw_data_dir=str(self.raw_data_dir),
+                    processed_data_dir=str(self.processed_data_dir),
+                    use_cache=self._parser_cache_enabled()
+                )
+                file_results = []
+                
+                # Spawned rather than forked workers: forking while the log
+                # listener thread runs can copy locks held by it
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    for result, stats, log_lines in pool.map(parse, raw_files, chunksize=8):
+                        for level, message in log_lines:
+                            self.logger.log(level, message)
+                        file_results.append(result)
+                        for key, value in stats.items():
+                            parser.stats[key] += value
             
-            self.logger.info(f"Processing phase completed successfully")
-            self.logger.info(f"Records processed: {self.pipeline_stats['total_records_processed']}")
+            summary = parser.write_combined_outputs(file_results)
+            self._record_processing_summary(summary)
             
             return summary
             
         except Exception as e:
             error_msg = f"Processing phase failed: {e}"
             self.logger.error(error_msg)
-            self.pipeline_stats["errors"].append(error_msg)
+            self.pipeline_stats.errors.append(error_msg)
             raise
     
-    def run_extraction_phase(self) -> Dict[str, Any]:
+    async def run_download_and_processing_phases(self, url_list_file: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run the download and processing phases concurrently.
+        
+        Raw files are parsed in a worker thread as soon as the downloader saves
+        them, so processing overlaps with network I/O instead of waiting for the
+        whole download to finish.
+        
+        Args:
+            url_list_file: Path to URL list JSON file
+            
+        Returns:
+            Tuple of (download summary, processing summary)
+        """
+        download_summary, processing_summary, _ = await self._download_and_process(url_list_file)
+        return download_summary, processing_summary
+    
+    async def run_fused(self, url_list_file: str) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        Run all three phases, handing the parsed records straight to extraction.
+        
+        The extraction phase uses the records kept in memory by the processing
+        phase instead of reading all_records_normalized.json back from disk.
+        
+        Args:
+            url_list_file: Path to URL list JSON file
+            
+        Returns:
+            Tuple of (download summary, processing summary, extraction summary)
+        """
+        download_summary, processing_summary, records = await self._download_and_process(url_list_file)
+        extraction_summary = await asyncio.get_running_loop().run_in_executor(
+            None, self.run_extraction_phase, records
+        )
+        return download_summary, processing_summary, extraction_summary
+    
+    async def _download_and_process(self, url_list_file: str) -> Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """Run download and processing concurrently; also return the parsed records."""
+        from data_parser import UtdanningDataParser
+        
+        # A new full run starts here, so the previous run's progress no longer applies
+        self._clear_stage_marker()
+        
+        parser = UtdanningDataParser(
+            raw_data_dir=str(self.raw_data_dir),
+            processed_data_dir=str(self.processed_data_dir),
+            logger=self.logger,
+            use_cache=self._parser_cache_enabled()
+        )
+        saved_files_queue: asyncio.Queue = asyncio.Queue()
+        consumer = asyncio.create_task(self._process_saved_files(parser, saved_files_queue))
+        
+        try:
+            download_summary = await self.run_download_phase(url_list_file, saved_files_queue)
+        except Exception:
+            consumer.cancel()
+            raise
+        
+        # Signal the consumer that no more files are coming
+        saved_files_queue.put_nowait(None)
+        
+        self.logger.info("=" * 60)
+        self.logger.info("PHASE 2: DATA PROCESSING")
+        self.logger.info("=" * 60)
+        
+        try:
+            processing_summary, records = await consumer
+            self._record_processing_summary(processing_summary)
+            return download_summary, processing_summary, records
+            
+        except Exception as e:
+            error_msg = f"Processing phase failed: {e}"
+            self.logger.error(error_msg)
+            self.pipeline_stats.errors.append(error_msg)
+            raise
+    
+    async def _process_saved_files(self, parser: 'UtdanningDataParser', saved_files_queue: asyncio.Queue) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Consume saved raw files from the queue and process them off the event loop.
+        
+        Args:
+            parser: Data parser instance
+            saved_files_queue: Queue of saved file paths, terminated by None
+            
+        Returns:
+            Tuple of (processing summary, all parsed records)
+        """
+        loop = asyncio.get_running_loop()
+        file_results = {}
+        
+        # A single worker keeps the parser's statistics consistent
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while (file_path := await saved_files_queue.get()) is not None:
+                if file_path.name.endswith("_summary.json"):
+                    continue  # Skip summary files
+                file_results[file_path] = await loop.run_in_executor(
+                    executor, parser.process_and_save_file, file_path
+                )
+            
+            # Pick up raw files from earlier runs that were not downloaded again
+            for json_file in parser.iter_raw_files():
+                if json_file not in file_results:
+                    file_results[json_file] = await loop.run_in_executor(
+                        executor, parser.process_and_save_file, json_file
+                    )
+            
+            results = [result for result in file_results.values() if result is not None]
+            summary = await loop.run_in_executor(executor, parser.write_combined_outputs, results)
+            return summary, [record for records, _ in results for record in records]
+    
+    def close(self):
+        """Flush pending log records and detach this pipeline's log handlers."""
+        self.logger.removeHandler(self._queue_handler)
+        self._log_listener.stop()
+        atexit.unregister(self._log_listener.stop)
+    
+    def _mark_stage_done(self, stage: str):
+        """Record the last completed phase so an interrupted run can resume."""
+        _dump({"version": 1, "stage": stage, "ts": time.time()}, self.output_dir / PIPELINE_MARKER)
+    
+    def _clear_stage_marker(self):
+        """Forget the previous run's last completed phase."""
+        try:
+            (self.output_dir / PIPELINE_MARKER).unlink()
+        except FileNotFoundError:
+            pass
+    
+    def last_completed_stage(self) -> Optional[str]:
+        """Return the last completed phase from the marker file, if any."""
+        try:
+            return _load(self.output_dir / PIPELINE_MARKER).get("stage")
+        except (OSError, ValueError, AttributeError):
+            return None
+    
+    async def resume_pipeline(self, url_list_file: str) -> Dict[str, Any]:
+        """
+        Run only the phases after the last completed one.
+        
+        Args:
+            url_list_file: Path to URL list JSON file
+            
+        Returns:
+            Summary of the last phase run
+        """
+        stage = self.last_completed_stage()
+        
+        if stage is None:
+            return await self.run_complete_pipeline(url_list_file)
+        
+        self.logger.info("Resuming pipeline after completed phase: %s", stage)
+        summary = {"success": True}
+        
+        if stage == "download":
+            summary = self.run_processing_phase()
+        if stage in ("download", "processing"):
+            summary = self.run_extraction_phase()
+        
+        return summary
+    
+    def _record_processing_summary(self, summary: Dict[str, Any]):
+        """Update pipeline statistics after the processing phase."""
+        self.pipeline_stats.phases_completed.append("processing")
+        self._mark_stage_done("processing")
+        self.pipeline_stats.total_records_processed = summary.get("total_records", 0)
+        
+        self.logger.info("Processing phase completed successfully")
+        self.logger.info("Records processed: %d", self.pipeline_stats.total_records_processed)
+    
+    def run_extraction_phase(self, records: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Run the text extraction phase.
         
+        Args:
+            records: Processed records already in memory; read from the
+                processed directory when not given
+        
         Returns:
             Extraction phase summary
         """
@@ -170,26 +581,29 @@ class UtdanningDataPipeline:
         self.logger.info("PHASE 3: TEXT EXTRACTION FOR VECTORIZATION")
         self.logger.info("=" * 60)
         
+        from text_extractor import TextExtractor
+        
         try:
             extractor = TextExtractor(
                 processed_data_dir=str(self.processed_data_dir),
                 logger=self.logger
             )
             
-            summary = extractor.create_vectorization_dataset()
+            summary = extractor.create_vectorization_dataset(records)
             
-            self.pipeline_stats["phases_completed"].append("extraction")
-            self.pipeline_stats["total_documents_created"] = summary.get("total_documents", 0)
+            self.pipeline_stats.phases_completed.append("extraction")
+            self._mark_stage_done("extraction")
+            self.pipeline_stats.total_documents_created = summary.get("total_documents", 0)
             
-            self.logger.info(f"Extraction phase completed successfully")
-            self.logger.info(f"Documents created: {self.pipeline_stats['total_documents_created']}")
+            self.logger.info("Extraction phase completed successfully")
+            self.logger.info("Documents created: %d", self.pipeline_stats.total_documents_created)
             
             return summary
             
         except Exception as e:
             error_msg = f"Extraction phase failed: {e}"
             self.logger.error(error_msg)
-            self.pipeline_stats["errors"].append(error_msg)
+            self.pipeline_stats.errors.append(error_msg)
             raise
     
     async def run_complete_pipeline(self, url_list_file: str) -> Dict[str, Any]:
@@ -202,66 +616,84 @@ class UtdanningDataPipeline:
         Returns:
             Complete pipeline summary
         """
-        self.pipeline_stats["start_time"] = time.time()
+        # Wall-clock times are for display; the duration uses a monotonic clock
+        self.pipeline_stats.start_time = time.time()
+        self._t0_perf = time.perf_counter()
         
         self.logger.info("🚀 Starting complete Utdanning.no data pipeline")
-        self.logger.info(f"URL list file: {url_list_file}")
-        self.logger.info(f"Output directory: {self.output_dir}")
+        self.logger.info("URL list file: %s", url_list_file)
+        self.logger.info("Output directory: %s", self.output_dir)
         self.logger.info("🇳🇴 Norwegian character encoding: UTF-8 enabled")
         
-        try:
-            # Phase 1: Download
-            download_summary = await self.run_download_phase(url_list_file)
-            
-            # Phase 2: Process
-            processing_summary = self.run_processing_phase()
-            
-            # Phase 3: Extract
-            extraction_summary = self.run_extraction_phase()
-            
-            # Final statistics
-            self.pipeline_stats["end_time"] = time.time()
-            self.pipeline_stats["duration_seconds"] = self.pipeline_stats["end_time"] - self.pipeline_stats["start_time"]
-            
-            # Create comprehensive summary
-            complete_summary = {
-                "pipeline_stats": self.pipeline_stats.copy(),
-                "download_summary": download_summary,
-                "processing_summary": processing_summary,
-                "extraction_summary": extraction_summary,
-                "success": True,
-                "output_structure": self._create_output_structure_summary()
-            }
-            
-            # Save complete summary
-            summary_file = self.output_dir / "complete_pipeline_summary.json"
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(complete_summary, f, ensure_ascii=False, indent=2)
-            
-            self._log_final_summary(complete_summary)
-            
-            return complete_summary
-            
-        except Exception as e:
-            self.pipeline_stats["end_time"] = time.time()
-            self.pipeline_stats["duration_seconds"] = self.pipeline_stats["end_time"] - self.pipeline_stats["start_time"]
-            
-            error_summary = {
-                "pipeline_stats": self.pipeline_stats.copy(),
-                "success": False,
-                "error": str(e)
-            }
-            
-            self.logger.error(f"Pipeline failed: {e}")
-            return error_summary
+        # The complete summary is written field by field as the phases finish
+        summary_file = self.output_dir / "complete_pipeline_summary.json"
+        
+        with StreamingJSONDict(summary_file) as summary_writer:
+            try:
+                try:
+                    # Phases 1 + 2: Download, processing files as they arrive
+                    download_summary, processing_summary, records = await self._download_and_process(url_list_file)
+                    summary_writer.write_field("download_summary", download_summary)
+                    summary_writer.write_field("processing_summary", processing_summary)
+                    
+                    # Phase 3: Extract (needs the complete record set, passed in memory)
+                    extraction_summary = await asyncio.get_running_loop().run_in_executor(
+                        None, self.run_extraction_phase, records
+                    )
+                    summary_writer.write_field("extraction_summary", extraction_summary)
+                finally:
+                    # Final statistics, recorded whether or not a phase failed
+                    self.pipeline_stats.end_time = time.time()
+                    self.pipeline_stats.duration_seconds = time.perf_counter() - self._t0_perf
+                
+                # Create comprehensive summary
+                complete_summary = {
+                    "pipeline_stats": self.pipeline_stats,
+                    "download_summary": download_summary,
+                    "processing_summary": processing_summary,
+                    "extraction_summary": extraction_summary,
+                    "success": True,
+                    "output_structure": self._create_output_structure_summary()
+                }
+                
+                self._log_final_summary(complete_summary)
+                
+                # success goes last, so a failure before it is still recorded
+                for field_name in ("output_structure", "pipeline_stats", "success"):
+                    summary_writer.write_field(field_name, complete_summary[field_name])
+                
+                return complete_summary
+                
+            except Exception as e:
+                error = str(e)
+                error_summary = {
+                    "pipeline_stats": self.pipeline_stats,
+                    "success": False,
+                    "error": error
+                }
+                
+                # Only the fields not already written, so no key appears twice
+                for field_name, value in error_summary.items():
+                    if field_name not in summary_writer.written:
+                        summary_writer.write_field(field_name, value)
+                
+                self.logger.error("Pipeline failed: %s", error)
+                return error_summary
     
     def _create_output_structure_summary(self) -> Dict[str, Any]:
         """Create a summary of the output file structure."""
+        # Reuse the previous summary while none of the directories changed
+        cache_key = tuple(
+            d.stat().st_mtime_ns for d in (self.raw_data_dir, self.processed_data_dir, self.logs_dir)
+        )
+        if self._output_struct_cache is not None and self._output_struct_cache[0] == cache_key:
+            return self._output_struct_cache[1]
+        
         structure = {
             "base_directory": str(self.output_dir),
             "raw_data": {
                 "directory": "raw/",
-                "files": list(f.name for f in self.raw_data_dir.glob("*.json") if f.is_file())[:10]  # First 10
+                "files": _first_n_files(self.raw_data_dir, ".json")  # First 10
             },
             "processed_data": {
                 "directory": "processed/",
@@ -282,10 +714,11 @@ class UtdanningDataPipeline:
             },
             "logs": {
                 "directory": "logs/",
-                "files": list(f.name for f in self.logs_dir.glob("*.log") if f.is_file())
+                "files": _first_n_files(self.logs_dir, ".log", n=None)
             }
         }
         
+        self._output_struct_cache = (cache_key, structure)
         return structure
     
     def _log_final_summary(self, summary: Dict[str, Any]):
@@ -294,34 +727,38 @@ class UtdanningDataPipeline:
         self.logger.info("🎉 PIPELINE COMPLETED SUCCESSFULLY!")
         self.logger.info("=" * 80)
         
-        duration_minutes = self.pipeline_stats["duration_seconds"] / 60
+        duration_minutes = self.pipeline_stats.duration_seconds / 60
         
-        self.logger.info(f"⏱️  Total duration: {duration_minutes:.1f} minutes")
-        self.logger.info(f"📁 Files downloaded: {self.pipeline_stats['total_files_downloaded']}")
-        self.logger.info(f"📊 Records processed: {self.pipeline_stats['total_records_processed']}")
-        self.logger.info(f"📝 Documents created: {self.pipeline_stats['total_documents_created']}")
-        self.logger.info(f"✅ Phases completed: {', '.join(self.pipeline_stats['phases_completed'])}")
+        self.logger.info("⏱️  Total duration: %.1f minutes", duration_minutes)
+        self.logger.info("📁 Files downloaded: %d", self.pipeline_stats.total_files_downloaded)
+        self.logger.info("📊 Records processed: %d", self.pipeline_stats.total_records_processed)
+        self.logger.info("📝 Documents created: %d", self.pipeline_stats.total_documents_created)
+        self.logger.info("✅ Phases completed: %s", ', '.join(self.pipeline_stats.phases_completed))
         
-        if self.pipeline_stats["errors"]:
-            self.logger.warning(f"⚠️  Errors encountered: {len(self.pipeline_stats['errors'])}")
+        if self.pipeline_stats.errors and self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning("⚠️  Errors encountered: %d", len(self.pipeline_stats.errors))
         
-        # Key output files
-        self.logger.info("\n📂 Key output files created:")
-        vectorization_dir = self.processed_data_dir / "text_for_llm"
-        if vectorization_dir.exists():
-            for file_name in ["vectorization_dataset.json", "texts_only.txt"]:
-                file_path = vectorization_dir / file_name
-                if file_path.exists():
-                    file_size = file_path.stat().st_size / (1024 * 1024)  # MB
-                    self.logger.info(f"   • {file_name} ({file_size:.1f} MB)")
+        # Key output files (skip the directory scan when INFO is filtered out)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("\n📂 Key output files created:")
+            vectorization_dir = self.processed_data_dir / "text_for_llm"
+            if vectorization_dir.exists():
+                key_files = ["vectorization_dataset.json", "texts_only.txt"]
+                with os.scandir(vectorization_dir) as it:
+                    sizes = {e.name: e.stat().st_size for e in it if e.name in key_files}
+                for file_name in key_files:
+                    if file_name in sizes:
+                        file_size = sizes[file_name] / (1024 * 1024)  # MB
+                        self.logger.info("   • %s (%.1f MB)", file_name, file_size)
         
-        self.logger.info(f"\n🎯 Ready for LLM vectorization!")
-        self.logger.info(f"📍 Output location: {self.output_dir}")
+        self.logger.info("\n🎯 Ready for LLM vectorization!")
+        self.logger.info("📍 Output location: %s", self.output_dir)
 
 
-def create_default_config() -> Dict[str, Any]:
-    """Create default configuration."""
-    return {
+@functools.lru_cache(maxsize=1)
+def create_default_config() -> types.MappingProxyType:
+    """Create default configuration (read-only; copy with dict() before updating)."""
+    return types.MappingProxyType({
         "downloader": {
             "max_concurrent": 5,
             "rate_limit": 0.2,
@@ -329,17 +766,18 @@ def create_default_config() -> Dict[str, Any]:
             "timeout": 30
         },
         "parser": {
-            "min_text_length": 20
+            "min_text_length": 20,
+            "cache": True
         },
         "extractor": {
             "max_chunk_size": 1500,
             "chunk_overlap": 200
         }
-    }
+    })
 
 
-async def main():
-    """Main function with command line interface."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(
         description="Download and process Utdanning.no API data for LLM vectorization"
     )
@@ -374,22 +812,48 @@ async def main():
         help="Only run the extraction phase (requires existing processed data)"
     )
     
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Only run the phases that did not complete in the previous run"
+    )
+    
     parser.add_argument(
         "--config",
         help="Path to configuration JSON file"
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the parser's content-hash extraction cache"
+    )
+    
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+async def main(argv: Optional[List[str]] = None):
+    """
+    Main function with command line interface.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    """
+    args = _PARSER.parse_args(argv)
     
     # Load configuration
-    config = create_default_config()
+    config = dict(create_default_config())
     if args.config:
         try:
-            with open(args.config, 'r', encoding='utf-8') as f:
-                user_config = json.load(f)
+            user_config = _load(args.config)
             config.update(user_config)
         except Exception as e:
             print(f"Warning: Could not load config file {args.config}: {e}")
+    if args.no_cache:
+        config["parser"] = {**config.get("parser", {}), "cache": False}
     
     # Initialize pipeline
     pipeline = UtdanningDataPipeline(
@@ -405,6 +869,8 @@ async def main():
             summary = pipeline.run_processing_phase()
         elif args.extract_only:
             summary = pipeline.run_extraction_phase()
+        elif args.resume:
+            summary = await pipeline.resume_pipeline(args.url_list)
         else:
             # Run complete pipeline
             summary = await pipeline.run_complete_pipeline(args.url_list)
@@ -421,11 +887,20 @@ async def main():
     except Exception as e:
         print(f"\n❌ Pipeline failed with error: {e}")
         sys.exit(1)
+    finally:
+        pipeline.close()
 
 
 if __name__ == "__main__":
     # Ensure we have the event loop for asyncio
     if sys.platform.startswith('win'):
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    else:
+        # libuv-based loop speeds up the aiohttp-heavy download phase
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
     
     asyncio.run(main())
\ No newline at end of file
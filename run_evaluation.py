@@ -4,8 +4,8 @@ Quick Evaluation Runner for AILO
 Run quick tests with different configurations
 """
 
-import subprocess
-import sys
+import asyncio
+import os
 from pathlib import Path
 
 
@@ -18,17 +18,23 @@ def print_header(title):
 
 def run_evaluation(max_questions=None, description=""):
     """Run evaluation with specified parameters."""
-    cmd = [sys.executable, "ailo_evaluation_framework.py"]
-    
-    if max_questions:
-        cmd.extend(["--max-questions", str(max_questions)])
-        cmd.append("--sample-categories")
-    
     print_header(description)
-    print(f"Command: {' '.join(cmd)}\n")
+    print(f"Questions: {max_questions or 'all'}\n")
     
-    result = subprocess.run(cmd, cwd=Path(__file__).parent)
-    return result.returncode
+    # Run in-process instead of spawning a new interpreter
+    os.chdir(Path(__file__).parent)
+    import ailo_evaluation_framework as aef
+    
+    try:
+        return asyncio.run(aef.main(
+            max_questions=max_questions,
+            sample_categories=bool(max_questions)
+        ))
+    except Exception as e:
+        print(f"\n\n❌ Error during evaluation: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
 
 
 def main():
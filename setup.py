@@ -8,7 +8,35 @@ import sys
 import locale
 import json
 import os
+import hashlib
+import importlib.util
+import site
 from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+
+def _dump(obj: Any, path: Path):
+    """Write obj to path as indented UTF-8 JSON."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def _load(path: Path) -> Any:
+    """Read JSON from path."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 
 def check_python_encoding():
@@ -45,13 +73,56 @@ def check_python_encoding():
         return False
 
 
+DEP_PROBE_CACHE = Path.home() / ".cache" / "ailo" / "dep_probe.json"
+
+
+def _dep_probe_key() -> str:
+    """Key for the dependency probe cache: interpreter plus site-packages state."""
+    site_dirs = site.getsitepackages() + [site.getusersitepackages()]
+    mtimes = [os.stat(d).st_mtime for d in site_dirs if os.path.isdir(d)]
+    raw = f"{sys.executable}|{sys.version}|{max(mtimes, default=0)}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _probe_packages(packages) -> dict:
+    """
+    Check which packages are installed without importing them.
+    
+    Results are cached per interpreter and invalidated whenever a
+    site-packages directory changes.
+    
+    Args:
+        packages: Package names to check
+        
+    Returns:
+        Dictionary of package name to availability
+    """
+    key = _dep_probe_key()
+    try:
+        cached = _load(DEP_PROBE_CACHE)
+        if cached.get("key") == key and all(p in cached["packages"] for p in packages):
+            return {p: cached["packages"][p] for p in packages}
+    except Exception:
+        pass  # Missing or unreadable cache, probe again
+    
+    results = {p: importlib.util.find_spec(p) is not None for p in packages}
+    
+    try:
+        DEP_PROBE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _dump({"key": key, "packages": results}, DEP_PROBE_CACHE)
+    except OSError:
+        pass  # Caching is best effort
+    
+    return results
+
+
 def check_dependencies():
     """Check if all required packages are available."""
     print("\n🔍 Checking package dependencies...")
     
     required_packages = [
-        'requests', 'aiohttp', 'pandas', 'numpy', 'tqdm', 
-        'sentence_transformers', 'sklearn', 'pathlib'
+        'requests', 'aiohttp', 'pandas', 'numpy', 'pyarrow', 'tqdm', 
+        'sentence_transformers', 'pathlib'
     ]
     
     optional_packages = [
@@ -61,21 +132,21 @@ def check_dependencies():
     missing_required = []
     missing_optional = []
     
+    available = _probe_packages(required_packages + optional_packages)
+    
     # Check required packages
     for package in required_packages:
-        try:
-            __import__(package)
+        if available[package]:
             print(f"   ✅ {package}")
-        except ImportError:
+        else:
             missing_required.append(package)
             print(f"   ❌ {package} (required)")
     
     # Check optional packages
     for package in optional_packages:
-        try:
-            __import__(package)
+        if available[package]:
             print(f"   ✅ {package} (optional)")
-        except ImportError:
+        else:
             missing_optional.append(package)
             print(f"   ⚠️  {package} (optional)")
     
@@ -91,6 +162,40 @@ def check_dependencies():
     return True
 
 
+def _stream_url_list(url_file: Path):
+    """
+    Count the entries of a JSON array file and return the first five.
+    
+    Uses ijson when installed so only one entry is in memory at a time.
+    
+    Returns:
+        Tuple of (entry count, first five entries), or (None, []) if the
+        file does not contain a JSON array
+    """
+    try:
+        import ijson
+    except ImportError:
+        urls = _load(url_file)
+        if not isinstance(urls, list):
+            return None, []
+        return len(urls), urls[:5]
+    
+    with open(url_file, 'rb') as f:
+        prefix, event, _ = next(ijson.parse(f))
+        if event != 'start_array':
+            return None, []
+        
+        f.seek(0)
+        sample = []
+        url_count = 0
+        for url_config in ijson.items(f, 'item'):
+            if url_count < 5:
+                sample.append(url_config)
+            url_count += 1
+    
+    return url_count, sample
+
+
 def validate_url_list():
     """Validate that the URL list exists and is properly formatted."""
     print("\n🔍 Checking URL list file...")
@@ -101,24 +206,33 @@ def validate_url_list():
         return False
     
     try:
-        with open(url_file, 'r', encoding='utf-8') as f:
-            urls = json.load(f)
-        
-        if not isinstance(urls, list):
-            print("   ❌ URL list should be a JSON array")
-            return False
+        if url_file.stat().st_size < 1_000_000:
+            urls = _load(url_file)
+            
+            if not isinstance(urls, list):
+                print("   ❌ URL list should be a JSON array")
+                return False
+            
+            url_count = len(urls)
+            sample = urls[:5]
+        else:
+            # Large list: stream the array instead of loading every entry
+            url_count, sample = _stream_url_list(url_file)
+            if url_count is None:
+                print("   ❌ URL list should be a JSON array")
+                return False
         
-        if len(urls) == 0:
+        if url_count == 0:
             print("   ❌ URL list is empty")
             return False
         
         # Check first few URLs for proper format
-        for i, url_config in enumerate(urls[:5]):
+        for i, url_config in enumerate(sample):
             if not isinstance(url_config, dict) or 'url' not in url_config:
                 print(f"   ❌ Invalid URL configuration at index {i}")
                 return False
         
-        print(f"   ✅ URL list valid ({len(urls)} endpoints)")
+        print(f"   ✅ URL list valid ({url_count} endpoints)")
         return True
         
     except json.JSONDecodeError as e:
@@ -144,8 +258,15 @@ def create_output_directories():
         "exports"
     ]
     
+    # Create shared parents once, shallowest first
+    needed = sorted({p for d in directories for p in (Path(d), *Path(d).parents)}, key=lambda p: len(p.parts))
+    for path in needed:
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass
+    
     for dir_path in directories:
-        Path(dir_path).mkdir(parents=True, exist_ok=True)
         print(f"   ✅ {dir_path}")
     
     return True
@@ -175,12 +296,10 @@ def test_norwegian_json_handling():
             
             # Save test file
             test_file = Path("test_norwegian.json")
-            with open(test_file, 'w', encoding='utf-8') as f:
-                json.dump(test_data, f, ensure_ascii=False, indent=2)
+            _dump(test_data, test_file)
             
             # Read back and verify
-            with open(test_file, 'r', encoding='utf-8') as f:
-                read_back = json.load(f)
+            read_back = _load(test_file)
             
             if read_back == test_data:
                 print("   ✅ File I/O with Norwegian characters: OK")
@@ -5,28 +5,57 @@ One command to rule them all
 """
 
 import asyncio
+import os
 import sys
-import subprocess
 from pathlib import Path
 
+from ailo_io import load_json
+from setup_ailo import probe_lmstudio
 
-async def main():
+
+def main():
     """Quick start AILO system."""
     print("=" * 60)
     print("🤖 AILO - Quick Start")
     print("=" * 60)
     print()
     
-    # Check if data exists
+    # Check if data exists (and whether an earlier pipeline run was interrupted)
     data_dir = Path("utdanning_data/processed/text_for_llm/vectorization_dataset.json")
+    marker = Path("utdanning_data/.pipeline_done")
+    
+    stage = None
+    if marker.exists():
+        try:
+            stage = load_json(marker).get("stage")
+        except Exception:
+            pass
+    
+    # A partial marker only means an interrupted run if it is newer than the
+    # dataset; an older one predates the run that produced the dataset
+    interrupted = stage in ("download", "processing") and (
+        not data_dir.exists() or marker.stat().st_mtime > data_dir.stat().st_mtime
+    )
     
-    if not data_dir.exists():
-        print("📥 No data found. Running data pipeline first...")
+    pipeline_ran = not data_dir.exists() or interrupted
+    if pipeline_ran:
+        pipeline_args = []
+        if interrupted:
+            print(f"📥 Resuming data pipeline after the {stage} phase...")
+            pipeline_args.append("--resume")
+        else:
+            print("📥 No data found. Running data pipeline first...")
         print("This will take a few minutes...\n")
         
-        result = subprocess.run([sys.executable, "main.py"], capture_output=False)
+        # Run the pipeline in this interpreter instead of a new process
+        from main import main as run_pipeline
+        try:
+            asyncio.run(run_pipeline(pipeline_args))
+            returncode = 0
+        except SystemExit as e:
+            returncode = e.code or 0
         
-        if result.returncode != 0:
+        if returncode != 0:
             print("\n❌ Data pipeline failed. Please check the logs.")
             sys.exit(1)
         
@@ -36,15 +65,9 @@ async def main():
     
     # Check LM Studio
     print("🔍 Checking LM Studio connection...")
-    try:
-        import aiohttp
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://localhost:1234/v1/models", timeout=5) as response:
-                if response.status == 200:
-                    print("✅ LM Studio is running\n")
-                else:
-                    print("⚠️  LM Studio responded but with unexpected status\n")
-    except:
+    if probe_lmstudio():
+        print("✅ LM Studio is running\n")
+    else:
         print("❌ Cannot connect to LM Studio!")
         print("   Please:")
         print("   1. Open LM Studio")
@@ -55,8 +78,17 @@ async def main():
     
     # Start chatbot
     print("🚀 Starting AILO chatbot...\n")
-    subprocess.run([sys.executable, "ailo_chatbot.py"])
+    
+    if pipeline_ran and os.name == "posix":
+        # Replace this process so the pipeline's modules and data are not kept
+        # in memory for the whole chat session
+        sys.stdout.flush()
+        chatbot = str(Path(__file__).parent / "ailo_chatbot.py")
+        os.execv(sys.executable, [sys.executable, chatbot])
+    
+    from ailo_chatbot import main as run_chatbot
+    asyncio.run(run_chatbot())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
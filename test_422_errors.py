@@ -4,9 +4,16 @@ Test specific URLs to capture 422 validation error details.
 """
 
 import asyncio
-import aiohttp
 import json
 
+from api_session import get_session, close_session
+
+async def _probe(session, url):
+    """Fetch a URL and return its status plus the error body for 422 responses."""
+    async with session.get(url) as response:
+        error_data = await response.json() if response.status == 422 else None
+        return url, response.status, error_data
+
 async def test_422_urls():
     # Test specific URLs that are showing 422 errors
     test_urls = [
@@ -23,24 +30,33 @@ async def test_422_urls():
     print("Testing URLs for 422 Validation Errors")
     print("=" * 80)
     
-    async with aiohttp.ClientSession() as session:
-        for url in test_urls:
-            try:
-                async with session.get(url) as response:
-                    if response.status == 422:
-                        error_data = await response.json()
-                        print(f'\n{"="*80}')
-                        print(f'URL: {url}')
-                        print(f'Status: 422 Validation Error')
-                        print(f'\nError Response:')
-                        print(json.dumps(error_data, indent=2, ensure_ascii=False))
-                        print("=" * 80)
-                    else:
-                        print(f'\n✓ {url}')
-                        print(f'  Status: {response.status}')
-            except Exception as e:
-                print(f'\n✗ {url}')
-                print(f'  Error: {e}')
+    session = await get_session()
+    try:
+        # Request all URLs concurrently, then report in the original order
+        results = await asyncio.gather(
+            *[_probe(session, url) for url in test_urls],
+            return_exceptions=True
+        )
+    finally:
+        await close_session()
+    
+    for url, result in zip(test_urls, results):
+        if isinstance(result, Exception):
+            print(f'\n✗ {url}')
+            print(f'  Error: {result}')
+            continue
+        
+        _, status, error_data = result
+        if status == 422:
+            print(f'\n{"="*80}')
+            print(f'URL: {url}')
+            print(f'Status: 422 Validation Error')
+            print(f'\nError Response:')
+            print(json.dumps(error_data, indent=2, ensure_ascii=False))
+            print("=" * 80)
+        else:
+            print(f'\n✓ {url}')
+            print(f'  Status: {status}')
 
 if __name__ == "__main__":
     asyncio.run(test_422_urls())
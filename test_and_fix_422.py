@@ -5,27 +5,45 @@ Tests each problematic URL to find the correct parameter combinations.
 """
 
 import asyncio
-import aiohttp
 import json
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+import time
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, urlencode
 
-async def test_url_with_params(session, base_url, params_to_test):
-    """Test a URL with different parameter combinations."""
-    results = []
+from api_session import get_session, close_session
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+class RateLimiter:
+    """Token bucket that allows `rate` requests per `per` seconds."""
     
-    for param_combo in params_to_test:
-        parsed = urlparse(base_url)
-        query_params = parse_qs(parsed.query)
-        query_params.update(param_combo)
-        
-        # Flatten lists in query params
-        flat_params = {k: v[0] if isinstance(v, list) and len(v) == 1 else v 
-                      for k, v in query_params.items()}
-        
-        new_query = urlencode(flat_params, doseq=True)
-        test_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, 
-                              parsed.params, new_query, parsed.fragment))
-        
+    def __init__(self, rate, per=1.0):
+        self.rate = rate
+        self.per = per
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def __aenter__(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+async def _probe(session, sem, limiter, test_url, param_combo):
+    """Request a single parameter combination and summarize the response."""
+    async with sem, limiter:
         try:
             async with session.get(test_url) as response:
                 result = {
@@ -46,17 +64,40 @@ async def test_url_with_params(session, base_url, params_to_test):
                     elif isinstance(data, list):
                         result['count'] = len(data)
                 
-                results.append(result)
+                return result
         except Exception as e:
-            results.append({
+            return {
                 'url': test_url,
                 'params': param_combo,
                 'status': 'error',
                 'error': str(e),
                 'success': False
-            })
+            }
+
+async def test_url_with_params(session, base_url, params_to_test, sem=None, limiter=None):
+    """Test a URL with different parameter combinations."""
+    sem = sem or asyncio.Semaphore(8)
+    limiter = limiter or RateLimiter(5)  # Be nice to the API
+    probes = []
     
-    return results
+    # The base URL is the same for every combination, so parse it only once
+    parsed = urlparse(base_url)
+    base_params = parse_qs(parsed.query)
+    
+    for param_combo in params_to_test:
+        query_params = {**base_params, **param_combo}
+        
+        # Flatten lists in query params
+        flat_params = {k: v[0] if isinstance(v, list) and len(v) == 1 else v 
+                      for k, v in query_params.items()}
+        
+        new_query = urlencode(flat_params, doseq=True)
+        test_url = parsed._replace(query=new_query).geturl()
+        
+        probes.append(_probe(session, sem, limiter, test_url, param_combo))
+    
+    # All combinations are independent, so request them concurrently
+    return await asyncio.gather(*probes)
 
 async def main():
     print("=" * 80)
@@ -117,8 +158,12 @@ async def main():
     ]
     
     all_fixes = {}
+    sem = asyncio.Semaphore(8)
+    limiter = RateLimiter(5)  # Keep to ~5 requests per second overall
     
-    async with aiohttp.ClientSession() as session:
+    # One shared session for all test cases so connections and DNS lookups are reused
+    session = await get_session()
+    try:
         for test_case in test_cases:
             print(f"\n{'='*80}")
             print(f"Testing: {test_case['description']}")
@@ -128,7 +173,9 @@ async def main():
             results = await test_url_with_params(
                 session, 
                 test_case['base_url'],
-                test_case['params_to_test']
+                test_case['params_to_test'],
+                sem,
+                limiter
             )
             
             successful = [r for r in results if r['success']]
@@ -162,8 +209,8 @@ async def main():
                                 print(f"     Error: {detail.get('msg', 'Unknown')}")
                                 if 'ctx' in detail and 'expected' in detail['ctx']:
                                     print(f"     Expected: {detail['ctx']['expected']}")
-            
-            await asyncio.sleep(0.5)  # Be nice to the API
+    finally:
+        await close_session()
     
     # Save results
     print(f"\n{'='*80}")
@@ -178,8 +225,12 @@ async def main():
             print()
         
         # Save to JSON
-        with open('url_fixes_tested.json', 'w', encoding='utf-8') as f:
-            json.dump(all_fixes, f, indent=2, ensure_ascii=False)
+        fixes_file = Path('url_fixes_tested.json')
+        if orjson is not None:
+            fixes_file.write_bytes(orjson.dumps(all_fixes, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(fixes_file, 'w', encoding='utf-8') as f:
+                json.dump(all_fixes, f, indent=2, ensure_ascii=False)
         
         print(f"💾 Fixes saved to: url_fixes_tested.json")
     else:
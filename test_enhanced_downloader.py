@@ -5,11 +5,59 @@ Tests parameter extraction and query parameter support
 """
 
 import asyncio
+import os
 import sys
 import json
+from pathlib import Path
 from api_downloader import UtdanningAPIDownloader
 
 
+PARAM_CACHE_FILE = Path("utdanning_data") / ".param_cache.json"
+
+
+def _raw_data_signature(raw_data_dir):
+    """Signature of the raw data: JSON file count and newest modification time."""
+    count = 0
+    newest = 0
+    if raw_data_dir.is_dir():
+        with os.scandir(raw_data_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    count += 1
+                    newest = max(newest, entry.stat().st_mtime_ns)
+    return [count, newest]
+
+
+def load_parameter_values(downloader):
+    """
+    Get parameter values from downloaded data, reusing the last scan if the
+    raw data has not changed since.
+    """
+    sig = _raw_data_signature(downloader.raw_data_dir)
+    
+    try:
+        with open(PARAM_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache["sig"] == sig:
+            return {param: set(values) for param, values in cache["values"].items()}
+    except (OSError, ValueError, KeyError):
+        pass  # No usable cache
+    
+    parameter_values = downloader._analyze_downloaded_data_for_parameters()
+    
+    try:
+        PARAM_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(PARAM_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({
+                "sig": sig,
+                "values": {param: sorted(values, key=str) for param, values in parameter_values.items()}
+            }, f, ensure_ascii=False)
+    except OSError:
+        pass
+    
+    return parameter_values
+
+
 async def test_parameter_extraction():
     """Test parameter extraction from existing data."""
     print("Testing parameter extraction...")
@@ -20,8 +68,8 @@ async def test_parameter_extraction():
         rate_limit=0.5
     )
     
-    # Test parameter analysis
-    parameter_values = downloader._analyze_downloaded_data_for_parameters()
+    # Test parameter analysis (cached while the raw data is unchanged)
+    parameter_values = load_parameter_values(downloader)
     
     print("\nExtracted parameter values:")
     for param, values in parameter_values.items():
@@ -4,6 +4,7 @@ Test script to verify AILO's source citation and data-only mode
 """
 
 import asyncio
+import re
 import sys
 from pathlib import Path
 
@@ -12,8 +13,16 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from ailo_chatbot import AILOChatbot
 
+SOURCE_RE = re.compile(r"kilde:|https://utdanning\.no", re.IGNORECASE)
+LIMITATION_RE = re.compile(r"ikke|informasjon|databasen|begrenset|utdanning\.no", re.IGNORECASE)
 
-async def test_source_citations():
+
+def _keywords_re(keywords):
+    """Compile a case-insensitive pattern matching any of the keywords."""
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+async def test_source_citations(ailo: AILOChatbot):
     """Test that AILO properly cites sources."""
     
     print("=" * 70)
@@ -21,10 +30,6 @@ async def test_source_citations():
     print("=" * 70)
     print()
     
-    # Initialize AILO
-    print("Initializing AILO...")
-    ailo = AILOChatbot()
-    
     # Test connection
     print("Testing LM Studio connection...")
     if not await ailo.test_connection():
@@ -33,10 +38,7 @@ async def test_source_citations():
         return False
     print("✅ PASSED: Connected to LM Studio\n")
     
-    # Load knowledge base
-    print("Loading knowledge base...")
-    ailo.load_knowledge_base()
-    
+    # Knowledge base is loaded once in main()
     if not ailo.knowledge_base:
         print("❌ FAILED: No knowledge base loaded")
         print("   Please run: python main.py")
@@ -70,6 +72,10 @@ async def test_source_citations():
     print("=" * 70)
     print()
     
+    # Compile each test case's keyword pattern once, up front
+    for test_case in test_cases:
+        test_case['keywords_re'] = _keywords_re(test_case['expected_keywords'])
+    
     results = []
     
     for i, test_case in enumerate(test_cases, 1):
@@ -82,17 +88,18 @@ async def test_source_citations():
         print(f"Response:\n{response}\n")
         
         # Check for source citation
-        has_source = "kilde:" in response.lower() or "https://utdanning.no" in response.lower()
+        has_source = SOURCE_RE.search(response) is not None
         
         # Check for expected keywords
-        has_keywords = any(keyword.lower() in response.lower() for keyword in test_case['expected_keywords'])
+        has_keywords = test_case['keywords_re'].search(response) is not None
         
         # Evaluate test
         if test_case['should_have_source']:
             source_test = has_source
             source_message = "✅ PASSED: Source citation found" if source_test else "❌ FAILED: No source citation"
         else:
-            source_test = not has_source or ("ikke" in response.lower() and "informasjon" in response.lower())
+            lowered = response.lower()
+            source_test = not has_source or ("ikke" in lowered and "informasjon" in lowered)
             source_message = "✅ PASSED: Honest about limitation" if source_test else "❌ FAILED: Should admit limitation"
         
         keyword_test = has_keywords
@@ -137,7 +144,7 @@ async def test_source_citations():
         return False
 
 
-async def test_data_only_mode():
+async def test_data_only_mode(ailo: AILOChatbot):
     """Test that AILO only uses data from knowledge base."""
     
     print("\n")
@@ -146,8 +153,8 @@ async def test_data_only_mode():
     print("=" * 70)
     print()
     
-    ailo = AILOChatbot()
-    ailo.load_knowledge_base()
+    # Start without the citation test's conversation history
+    ailo.clear_conversation()
     
     print("Testing that AILO doesn't use external knowledge...")
     print()
@@ -168,9 +175,7 @@ async def test_data_only_mode():
         print()
         
         # Check if AILO admits limitation
-        admits_limitation = any(phrase in response.lower() for phrase in [
-            "ikke", "informasjon", "databasen", "begrenset", "utdanning.no"
-        ])
+        admits_limitation = LIMITATION_RE.search(response) is not None
         
         if admits_limitation:
             print("✅ PASSED: AILO correctly identified lack of relevant data")
@@ -193,9 +198,19 @@ async def main():
     print("╚" + "═" * 68 + "╝")
     print()
     
+    # Initialize AILO and load the knowledge base once for both tests
+    print("Initializing AILO...")
+    ailo = AILOChatbot()
+    print("Loading knowledge base...")
+    ailo.load_knowledge_base()
+    print()
+    
     # Run tests
-    test1_passed = await test_source_citations()
-    test2_passed = await test_data_only_mode()
+    try:
+        test1_passed = await test_source_citations(ailo)
+        test2_passed = await test_data_only_mode(ailo)
+    finally:
+        await ailo.close()
     
     # Final summary
     print()
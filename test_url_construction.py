@@ -3,6 +3,55 @@
 Test URL construction from API endpoints
 """
 
+import sys
+from functools import lru_cache
+
+
+def _handle_sammenligning(endpoint: str) -> str:
+    # sammenligning/lonn/... -> /sammenligning or specific page
+    if '/uno/id-' in endpoint:
+        # Extract the ID (e.g., id-y/sykepleier)
+        id_part = endpoint.split('/uno/id-')[1]
+        if '/' in id_part:
+            segments = id_part.split('/')
+            id_part = f"{segments[0]}/{segments[1]}"
+        return f"https://utdanning.no/sammenligning/{id_part}"
+    return "https://utdanning.no/sammenligning"
+
+
+def _handle_yrker(endpoint: str) -> str:
+    # Keep the occupation name if present
+    if '/beskrivelse/' in endpoint:
+        return f"https://utdanning.no/{endpoint}"
+    return "https://utdanning.no/yrker"
+
+
+def _static(url: str):
+    return lambda endpoint: url
+
+
+# Keyword -> handler, in the order the keywords are matched. The order is
+# the precedence: 'jobbkompasset/yrker' maps to /yrker because 'yrker' is
+# checked first, so the first path segment alone cannot pick the handler
+ROUTES = (
+    ('sammenligning', _handle_sammenligning),
+    ('yrker', _handle_yrker),
+    ('yrkesvalg', _handle_yrker),
+    ('utdanning', _static("https://utdanning.no/utdanning")),
+    ('studievelgeren', _static("https://utdanning.no/utdanning")),
+    ('finnlarebedrift', _static("https://utdanning.no/nb/finn-larebedrift")),
+    ('lærebedrift', _static("https://utdanning.no/nb/finn-larebedrift")),
+    ('veientilfagbrev', _static("https://utdanning.no/nb/vei-til-fagbrev")),
+    ('arbeidsmarkedskart', _static("https://utdanning.no/arbeidsmarked")),
+    ('jobbkompasset', _static("https://utdanning.no/arbeidsmarked")),
+    ('regionalkompetanse', _static("https://utdanning.no/regionalkompetanse")),
+    ('onet', _static("https://utdanning.no/yrker")),
+    ('search', _static("https://utdanning.no/sok")),
+    ('søk', _static("https://utdanning.no/sok")),
+)
+
+
+@lru_cache(maxsize=4096)
 def construct_url_from_endpoint(endpoint: str) -> str:
     """
     Construct a web URL from an API endpoint.
@@ -11,71 +60,115 @@ def construct_url_from_endpoint(endpoint: str) -> str:
     # Remove 'param/' prefix if present
     endpoint = endpoint.replace('param/', '')
     
-    # Map API endpoints to web URLs
+    # Use the first known keyword found anywhere in the endpoint
+    for keyword, handler in ROUTES:
+        if keyword in endpoint:
+            return handler(endpoint)
+    
+    # Generic fallback
+    clean_endpoint = endpoint.strip('/').replace('//', '/')
+    return f"https://utdanning.no/{clean_endpoint}"
+
+
+def reference_url_from_endpoint(endpoint: str) -> str:
+    """
+    The original if/elif implementation, kept as the oracle for generated cases.
+    """
+    endpoint = endpoint.replace('param/', '')
+    
     if 'sammenligning' in endpoint:
-        # sammenligning/lonn/... -> /sammenligning or specific page
         if '/uno/id-' in endpoint:
-            # Extract the ID (e.g., id-y/sykepleier)
             parts = endpoint.split('/uno/id-')
             if len(parts) > 1:
                 id_part = parts[1].split('/')[0] + '/' + parts[1].split('/')[1] if '/' in parts[1] else parts[1]
                 return f"https://utdanning.no/sammenligning/{id_part}"
         return "https://utdanning.no/sammenligning"
-    
     elif 'yrker' in endpoint or 'yrkesvalg' in endpoint:
-        # Extract occupation name if present
         if '/beskrivelse/' in endpoint:
             return f"https://utdanning.no/{endpoint}"
         return "https://utdanning.no/yrker"
-    
     elif 'utdanning' in endpoint or 'studievelgeren' in endpoint:
         return "https://utdanning.no/utdanning"
-    
     elif 'finnlarebedrift' in endpoint or 'lærebedrift' in endpoint:
         return "https://utdanning.no/nb/finn-larebedrift"
-    
     elif 'veientilfagbrev' in endpoint:
         return "https://utdanning.no/nb/vei-til-fagbrev"
-    
     elif 'arbeidsmarkedskart' in endpoint or 'jobbkompasset' in endpoint:
         return "https://utdanning.no/arbeidsmarked"
-    
     elif 'regionalkompetanse' in endpoint:
         return "https://utdanning.no/regionalkompetanse"
-    
     elif 'onet' in endpoint:
         return "https://utdanning.no/yrker"
-    
     elif 'search' in endpoint or 'søk' in endpoint:
         return "https://utdanning.no/sok"
-    
     else:
-        # Generic fallback
         clean_endpoint = endpoint.strip('/').replace('//', '/')
         return f"https://utdanning.no/{clean_endpoint}"
 
 
-# Test cases
-test_endpoints = [
-    "sammenligning/lonn/arbeidstid-H/historie-true/sektor-A/uno/id-y/gravor",
-    "sammenligning/arbeidsmarked/uno/id-y/sykepleier",
-    "sammenligning/main",
-    "yrker/beskrivelse/laerer",
-    "utdanning/beskrivelse/sykepleie",
-    "finnlarebedrift/naringskodevelger",
-    "veientilfagbrev/veier",
-    "arbeidsmarkedskart/endring_arbeidsmarked",
-    "onet/yrker",
-    "search/result",
-    "param/sammenligning/yrke/y/informatiker",
-]
-
-print("Testing URL Construction")
-print("=" * 80)
-
-for endpoint in test_endpoints:
+# Test cases: endpoint -> expected URL
+GOLDEN = {
+    "sammenligning/lonn/arbeidstid-H/historie-true/sektor-A/uno/id-y/gravor": "https://utdanning.no/sammenligning/y/gravor",
+    "sammenligning/arbeidsmarked/uno/id-y/sykepleier": "https://utdanning.no/sammenligning/y/sykepleier",
+    "sammenligning/main": "https://utdanning.no/sammenligning",
+    "yrker/beskrivelse/laerer": "https://utdanning.no/yrker/beskrivelse/laerer",
+    "utdanning/beskrivelse/sykepleie": "https://utdanning.no/utdanning",
+    "finnlarebedrift/naringskodevelger": "https://utdanning.no/nb/finn-larebedrift",
+    "veientilfagbrev/veier": "https://utdanning.no/nb/vei-til-fagbrev",
+    "arbeidsmarkedskart/endring_arbeidsmarked": "https://utdanning.no/arbeidsmarked",
+    "onet/yrker": "https://utdanning.no/yrker",
+    "search/result": "https://utdanning.no/sok",
+    "param/sammenligning/yrke/y/informatiker": "https://utdanning.no/sammenligning",
+    # A keyword earlier in ROUTES wins over the first path segment
+    "jobbkompasset/yrker": "https://utdanning.no/yrker",
+    "onet/utdanning": "https://utdanning.no/utdanning",
+    "search/utdanning": "https://utdanning.no/utdanning",
+    "regionalkompetanse/yrker": "https://utdanning.no/yrker",
+    # Incomplete IDs are passed through as they are
+    "sammenligning/uno/id-y/": "https://utdanning.no/sammenligning/y/",
+    "sammenligning/x/uno/id-": "https://utdanning.no/sammenligning/",
+}
+
+# Grammar for generated endpoints: every base combined with every suffix
+BASES = (
+    "sammenligning/lonn", "sammenligning/arbeidsmarked", "yrker", "yrkesvalg",
+    "utdanning", "studievelgeren", "finnlarebedrift", "veientilfagbrev",
+    "arbeidsmarkedskart", "jobbkompasset", "regionalkompetanse", "onet",
+    "search", "param/sammenligning", "ukjent",
+)
+SUFFIXES = (
+    "main", "beskrivelse/laerer", "uno/id-y/sykepleier", "uno/id-u/informatikk",
+    "result", "naringskodevelger", "", "yrker", "utdanning", "søk", "uno/id-y/",
+    "onet/yrker/beskrivelse/x",
+)
+
+
+def gen_endpoints():
+    """Yield the golden endpoints, then every generated base/suffix endpoint."""
+    yield from GOLDEN
+    for base in BASES:
+        for suffix in SUFFIXES:
+            yield f"{base}/{suffix}"
+
+
+# Collect the report and write it in one go instead of printing per endpoint
+lines = ["Testing URL Construction", "=" * 80]
+
+checked = 0
+failures = 0
+for endpoint in gen_endpoints():
     url = construct_url_from_endpoint(endpoint)
-    print(f"\nEndpoint: {endpoint}")
-    print(f"URL:      {url}")
+    # Golden endpoints have a fixed URL; generated ones must match the original chain
+    expected = GOLDEN.get(endpoint) or reference_url_from_endpoint(endpoint)
+    checked += 1
+    
+    if url != expected:
+        failures += 1
+        lines.append(f"\nEndpoint: {endpoint}")
+        lines.append(f"URL:      {url}")
+        lines.append(f"Expected: {expected}")
 
-print("\n" + "=" * 80)
+lines.append(f"\nChecked {checked} endpoints, {failures} mismatches")
+lines.append("\n" + "=" * 80)
+lines.append(f"Cache: {construct_url_from_endpoint.cache_info()}")
+sys.stdout.write("\n".join(lines) + "\n")
@@ -3,15 +3,292 @@ Text Extraction and Vectorization Preparation for Utdanning.no API Data
 Extracts and prepares text content for LLM vectorization and embedding generation.
 """
 
+import csv
 import json
-import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import logging
+import multiprocessing
+import os
 import re
+import sys
+from dataclasses import dataclass
 from datetime import datetime
 import hashlib
+import itertools
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+try:
+    import ijson
+except ImportError:  # Fall back to loading the whole file with json
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:  # Fall back to one substring scan per term
+    ahocorasick = None
+
+
+# Common words skipped when picking frequent keywords
+STOPWORDS = frozenset(['dette', 'være', 'skal', 'eller', 'hvor', 'også', 'hvis'])
+
+# Terms that indicate educational context in relevance scoring
+CONTEXT_INDICATORS = (
+    'utdanning', 'skole', 'studium', 'læring', 'kurs', 'eksamen',
+    'kompetanse', 'kvalifikasjon', 'yrke', 'karriere', 'jobb'
+)
+
+# Context line templates for enhance_text_with_context
+SOURCE_TEMPLATE = "Kilde: {context}"
+METADATA_TEMPLATE = "Metadata: {fields}"
+
+# Metadata fields included in the context line
+METADATA_FIELD_LIMIT = 5
+
+# Records per endpoint combined into a semantic document
+SEMANTIC_GROUP_LIMIT = 10
+
+# Human-readable context per API, in the order names are matched
+ENDPOINT_CONTEXTS = {
+    'arbeidsmarkedskart': 'Arbeidsmarkedsdata og statistikk',
+    'finnlarebedrift': 'Informasjon om lærebedrifter og læreplasser',
+    'jobbkompasset': 'Jobbveiledning og yrkesråd',
+    'karakterkalkulator': 'Karakterberegning og poengkalkulator',
+    'kategorisystemer': 'Utdannings- og yrkeskategorisering',
+    'linje': 'Utdanningsprogrammer og artikler',
+    'sammenligning': 'Sammenligning av yrker og utdanninger',
+    'studievelgeren': 'Hjelp til valg av studier',
+    'utdanningsdata': 'Utdanningsstatistikk og data',
+    'vgs': 'Videregående skole informasjon',
+    'yrkearbeidsliv': 'Yrkesliv og arbeidsmarked',
+    'ovttas': 'Voksenopplæring og kursvirksomhet',
+    'regionalkompetanse': 'Regional kompetanse og arbeidsmarked',
+    'veientilfagbrev': 'Veier til fagbrev og yrkeskvalifikasjon'
+}
+
+# Readable Norwegian names of technical metadata fields
+FIELD_TRANSLATIONS = {
+    'id': 'ID',
+    'nid': 'Node ID',
+    'title': 'Tittel',
+    'navn': 'Navn',
+    'beskrivelse': 'Beskrivelse',
+    'type': 'Type',
+    'kategori': 'Kategori',
+    'kode': 'Kode',
+    'dato': 'Dato',
+    'status': 'Status',
+    'programomradekode10': 'Programområdekode',
+    'yrkeskode_styrk08': 'Yrkeskode',
+    'nus_kode': 'NUS-kode',
+    'styrk98_kode': 'STYRK98-kode',
+    'uno_id': 'UNO ID'
+}
+
+# Character shingle length and band width for SimHash near-duplicate detection.
+# Signatures differing in at most 3 bits always share one of the four 16-bit
+# bands, while 4 differing bits can fall one in each band, so 3 is the
+# largest threshold the band index finds every pair for
+SIMHASH_SHINGLE = 6
+SIMHASH_BAND_BITS = 16
+SIMHASH_THRESHOLD = 3
+
+# Fewest records worth starting worker processes for when workers is not set
+EXPAND_POOL_MIN_RECORDS = 2000
+
+# Records sent to a worker process at a time
+EXPAND_CHUNKSIZE = 256
+
+# Columns of the CSV/Parquet dataset summary
+SUMMARY_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("type", pa.string()),
+    ("source_endpoint", pa.string()),
+    ("title", pa.string()),
+    ("content_length", pa.int64()),
+    ("keyword_count", pa.int64()),
+    ("educational_relevance", pa.float64()),
+    ("text_preview", pa.string()),
+])
+PARQUET_BATCH_SIZE = 10_000
+
+# Buffered bytes of texts_only.txt written per flush
+TEXT_FLUSH_BYTES = 1 << 20
+
+_WORD_RE = re.compile(r'\b[a-zA-ZæøåÆØÅ]{4,}\b')
+_SPACE_RE = re.compile(' ')
+
+
+def _build_automaton(terms: Iterable[str]):
+    """Build an Aho-Corasick automaton over terms, or None without pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
+
+
+def _find_terms(automaton, terms: Iterable[str], text_lower: str) -> set:
+    """Return the terms occurring in text_lower, in a single pass when possible."""
+    if automaton is None:
+        return {term for term in terms if term in text_lower}
+    return {term for _, term in automaton.iter(text_lower)}
+
+
+# slots=True is only accepted by dataclass on Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Output key order of a document; fields that are None are left out
+_DOCUMENT_KEYS = (
+    "id", "type", "source_record_id", "source_endpoint", "chunk_index", "total_chunks",
+    "records_count", "title", "text", "metadata", "content_length", "keywords",
+    "educational_relevance"
+)
+
+
+@dataclass(**_SLOTS)
+class Document:
+    """A document of the vectorization dataset."""
+    type: str
+    source_endpoint: str
+    title: str
+    text: str
+    metadata: Dict[str, Any]
+    keywords: List[str]
+    educational_relevance: float
+    source_record_id: Optional[str] = None  # Full and chunked documents
+    chunk_index: Optional[int] = None  # Chunked documents
+    total_chunks: Optional[int] = None  # Chunked documents
+    records_count: Optional[int] = None  # Semantic documents
+    id: Optional[int] = None  # Assigned once all documents are created
+    
+    @property
+    def content_length(self) -> int:
+        """Length of the document text."""
+        return len(self.text)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the document as a JSON-serializable dictionary."""
+        doc = {}
+        for key in _DOCUMENT_KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                doc[key] = value
+        return doc
+
+
+def _dumps_document(doc: "Document") -> bytes:
+    """Serialize one document to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(doc.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(doc.to_dict(), ensure_ascii=False).encode('utf-8')
+
+
+def _write_json(path: Path, obj: Any, indent: bool = False) -> None:
+    """Write obj to path as UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2 if indent else None)
+
+
+def _simhash(text: str) -> int:
+    """Compute the 64-bit SimHash of text from its character shingles."""
+    shingles = {text[i:i + SIMHASH_SHINGLE] for i in range(len(text) - SIMHASH_SHINGLE + 1)} or {text}
+    digests = b''.join(
+        hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles
+    )
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(-1, 64)
+    
+    # A bit is set when more shingle hashes vote +1 than -1 for it
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+
+@lru_cache(maxsize=4096)
+def _endpoint_context(endpoint: str) -> str:
+    """Return the human-readable context of an API endpoint."""
+    # The first known API name found in the endpoint wins, in table order
+    for key, description in ENDPOINT_CONTEXTS.items():
+        if key in endpoint:
+            return description
+    
+    return endpoint.replace('/', ' ').replace('_', ' ').title()
+
+
+@lru_cache(maxsize=4096)
+def _source_line(endpoint: str) -> str:
+    """Return the source context line added to texts from an endpoint."""
+    endpoint_context = _endpoint_context(endpoint)
+    return SOURCE_TEMPLATE.format(context=endpoint_context) if endpoint_context else ""
+
+
+@lru_cache(maxsize=512)
+def _readable_field_name(field_name: str) -> str:
+    """Return the readable Norwegian name of a technical field name."""
+    clean_name = field_name.lower().split('.')[-1]  # Remove path prefixes
+    return FIELD_TRANSLATIONS.get(clean_name, clean_name.replace('_', ' ').title())
+
+
+def _summary_row(doc: "Document") -> Dict[str, Any]:
+    """Build the CSV/Parquet summary row of a document."""
+    return {
+        "id": doc.id,
+        "type": doc.type,
+        "source_endpoint": doc.source_endpoint or "",
+        "title": doc.title[:100] + "..." if len(doc.title) > 100 else doc.title,
+        "content_length": doc.content_length,
+        "keyword_count": len(doc.keywords),
+        "educational_relevance": doc.educational_relevance,
+        "text_preview": doc.text[:200] + "..." if len(doc.text) > 200 else doc.text
+    }
+
+
+def _iter_records(records_file: Path) -> Iterator[Dict]:
+    """
+    Yield the records of a JSON array file one at a time.
+    
+    Uses ijson when installed so the whole file is never held in memory,
+    otherwise parses the whole file (with orjson when installed).
+    """
+    if ijson is None:
+        if orjson is not None:
+            yield from orjson.loads(records_file.read_bytes())
+            return
+        with open(records_file, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+    
+    with open(records_file, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+# Extractor reused by every record a worker process expands
+_worker_extractor = None
+
+
+def _init_worker(processed_data_dir: str) -> None:
+    """Create the extractor of a worker process."""
+    global _worker_extractor
+    _worker_extractor = TextExtractor(processed_data_dir, workers=1)
+
+
+def _expand_in_worker(record: Dict) -> Tuple[Document, List[Document], int]:
+    """Expand a single record inside a worker process."""
+    return _worker_extractor._expand_record(record)
 
 
 class TextExtractor:
@@ -19,16 +296,22 @@ class TextExtractor:
     Extracts and prepares text content for vectorization.
     """
     
-    def __init__(self, processed_data_dir: str, logger: Optional[logging.Logger] = None):
+    def __init__(self, processed_data_dir: str, logger: Optional[logging.Logger] = None,
+                 workers: Optional[int] = None):
         """
         Initialize text extractor.
         
         Args:
             processed_data_dir: Directory containing processed data
             logger: Logger instance
+            workers: Processes used to expand records into documents; 1
+                expands in-process. By default records are expanded
+                in-process unless there are at least EXPAND_POOL_MIN_RECORDS,
+                in which case one process per CPU is used
         """
         self.processed_data_dir = Path(processed_data_dir)
         self.logger = logger or logging.getLogger(__name__)
+        self.workers = workers
         
         # Create output directories
         self.text_output_dir = self.processed_data_dir / "text_for_llm"
@@ -40,6 +323,9 @@ class TextExtractor:
         self.chunk_overlap = 200
         self.context_separator = "\n---\n"
         
+        # Near-duplicate records (SimHash of the record content)
+        self.simhash_threshold = SIMHASH_THRESHOLD  # Max differing bits
+        
         # Domain-specific terminology for educational content
         self.educational_keywords = [
             'utdanning', 'studium', 'skole', 'universitet', 'høgskole', 'fagskole',
@@ -48,6 +334,12 @@ class TextExtractor:
             'arbeidsmarked', 'karriere', 'jobb', 'stilling', 'bedrift',
             'lærlingeplass', 'praksis', 'internship', 'opplæring'
         ]
+        self._keyword_automaton = _build_automaton(self.educational_keywords)
+        
+        # Context indicators split into those found by the keyword scan and the rest
+        self._keyword_indicators = frozenset(CONTEXT_INDICATORS).intersection(self.educational_keywords)
+        self._extra_indicators = tuple(i for i in CONTEXT_INDICATORS if i not in self._keyword_indicators)
+        self._indicator_automaton = _build_automaton(self._extra_indicators) if self._extra_indicators else None
     
     def enhance_text_with_context(self, text: str, metadata: Dict[str, Any], source_endpoint: str) -> str:
         """
@@ -63,21 +355,23 @@ class TextExtractor:
         """
         context_parts = []
         
-        # Add source context
-        endpoint_context = self._get_endpoint_context(source_endpoint)
-        if endpoint_context:
-            context_parts.append(f"Kilde: {endpoint_context}")
+        # Add source context (depends only on the endpoint, so cached per endpoint)
+        source_line = _source_line(source_endpoint)
+        if source_line:
+            context_parts.append(source_line)
         
-        # Add relevant metadata as context
+        # Add relevant metadata as context, stopping at the first few fields
         context_metadata = []
         for key, value in metadata.items():
             if value and str(value).strip():
                 # Convert technical field names to readable Norwegian
                 readable_key = self._translate_field_name(key)
                 context_metadata.append(f"{readable_key}: {value}")
+                if len(context_metadata) >= METADATA_FIELD_LIMIT:
+                    break
         
         if context_metadata:
-            context_parts.append("Metadata: " + "; ".join(context_metadata[:5]))  # Limit to 5 most relevant
+            context_parts.append(METADATA_TEMPLATE.format(fields="; ".join(context_metadata)))
         
         # Combine context and text
         if context_parts:
@@ -97,28 +391,7 @@ class TextExtractor:
         Returns:
             Human-readable description
         """
-        endpoint_contexts = {
-            'arbeidsmarkedskart': 'Arbeidsmarkedsdata og statistikk',
-            'finnlarebedrift': 'Informasjon om lærebedrifter og læreplasser',
-            'jobbkompasset': 'Jobbveiledning og yrkesråd',
-            'karakterkalkulator': 'Karakterberegning og poengkalkulator',
-            'kategorisystemer': 'Utdannings- og yrkeskategorisering',
-            'linje': 'Utdanningsprogrammer og artikler',
-            'sammenligning': 'Sammenligning av yrker og utdanninger',
-            'studievelgeren': 'Hjelp til valg av studier',
-            'utdanningsdata': 'Utdanningsstatistikk og data',
-            'vgs': 'Videregående skole informasjon',
-            'yrkearbeidsliv': 'Yrkesliv og arbeidsmarked',
-            'ovttas': 'Voksenopplæring og kursvirksomhet',
-            'regionalkompetanse': 'Regional kompetanse og arbeidsmarked',
-            'veientilfagbrev': 'Veier til fagbrev og yrkeskvalifikasjon'
-        }
-        
-        for key, description in endpoint_contexts.items():
-            if key in endpoint:
-                return description
-        
-        return endpoint.replace('/', ' ').replace('_', ' ').title()
+        return _endpoint_context(endpoint)
     
     def _translate_field_name(self, field_name: str) -> str:
         """
@@ -130,61 +403,109 @@ class TextExtractor:
         Returns:
             Human-readable Norwegian field name
         """
-        translations = {
-            'id': 'ID',
-            'nid': 'Node ID',
-            'title': 'Tittel',
-            'navn': 'Navn',
-            'beskrivelse': 'Beskrivelse',
-            'type': 'Type',
-            'kategori': 'Kategori',
-            'kode': 'Kode',
-            'dato': 'Dato',
-            'status': 'Status',
-            'programomradekode10': 'Programområdekode',
-            'yrkeskode_styrk08': 'Yrkeskode',
-            'nus_kode': 'NUS-kode',
-            'styrk98_kode': 'STYRK98-kode',
-            'uno_id': 'UNO ID'
-        }
-        
-        # Clean the field name
-        clean_name = field_name.lower().split('.')[-1]  # Remove path prefixes
-        
-        return translations.get(clean_name, clean_name.replace('_', ' ').title())
+        return _readable_field_name(field_name)
     
-    def create_vectorization_dataset(self) -> Dict[str, Any]:
+    def create_vectorization_dataset(self, records: Optional[Iterable[Dict]] = None) -> Dict[str, Any]:
         """
         Create a comprehensive dataset for vectorization.
         
+        Records are consumed in a single pass, so the record file can be
+        streamed instead of loaded whole.
+        
+        Args:
+            records: Processed records already in memory; streamed from
+                all_records_normalized.json when not given
+        
         Returns:
             Dataset summary
         """
-        # Load processed records
-        records_file = self.processed_data_dir / "all_records_normalized.json"
-        if not records_file.exists():
-            raise FileNotFoundError("No processed records found. Run data parser first.")
-        
-        with open(records_file, 'r', encoding='utf-8') as f:
-            records = json.load(f)
+        if records is None:
+            # Load processed records
+            records_file = self.processed_data_dir / "all_records_normalized.json"
+            if not records_file.exists():
+                raise FileNotFoundError("No processed records found. Run data parser first.")
+            
+            records = _iter_records(records_file)
         
         # Create different types of text documents
-        documents = []
-        document_id = 0
-        
-        # Type 1: Full record documents (for comprehensive context)
-        full_documents = self._create_full_documents(records, document_id)
-        documents.extend(full_documents)
-        document_id += len(full_documents)
+        full_documents = []
+        chunked_documents = []
+        
+        # Per-endpoint record counts and first records, for the semantic documents
+        endpoint_counts: Dict[str, int] = {}
+        endpoint_groups: Dict[str, List[Dict]] = {}
+        
+        # Enhanced texts of the grouped records, taken from their full documents
+        grouped_ids = set()
+        enhanced_texts: Dict[str, str] = {}
+        
+        # Content hashes seen so far; mirrored and retried responses repeat records
+        seen_content = set()
+        duplicates = 0
+        
+        # SimHash band -> full document indices, and the signature of the
+        # document currently kept at each index, for near-duplicate lookup
+        simhash_bands: Dict[Tuple[int, int], List[int]] = {}
+        signatures: List[int] = []
+        near_duplicates = 0
+        
+        # Chunked documents of each kept full document, by full document index
+        chunks_by_document: List[List[Document]] = []
+        
+        def expandable_records() -> Iterator[Dict]:
+            """Filter out duplicate and short records, tracking endpoint groups on the way."""
+            nonlocal duplicates
+            for record in records:
+                content_hash = hashlib.sha256(record["content"].encode('utf-8')).digest()
+                if content_hash in seen_content:
+                    duplicates += 1
+                    continue
+                seen_content.add(content_hash)
+                
+                endpoint = record["source_endpoint"]
+                endpoint_counts[endpoint] = endpoint_counts.get(endpoint, 0) + 1
+                group = endpoint_groups.setdefault(endpoint, [])
+                if len(group) < SEMANTIC_GROUP_LIMIT:
+                    group.append(record)
+                    grouped_ids.add(record["id"])
+                
+                if len(record["content"].strip()) >= self.min_text_length:
+                    yield record
         
-        # Type 2: Chunked documents (for detailed information retrieval)
-        chunked_documents = self._create_chunked_documents(records, document_id)
-        documents.extend(chunked_documents)
-        document_id += len(chunked_documents)
+        for full_document, record_chunks, signature in self._expand_records(expandable_records()):
+            if full_document.source_record_id in grouped_ids:
+                enhanced_texts[full_document.source_record_id] = full_document.text
+            
+            # Type 1: Full record documents (for comprehensive context)
+            index = self._add_full_document(full_documents, full_document, signature,
+                                            simhash_bands, signatures)
+            
+            # Type 2: Chunked documents (for detailed information retrieval),
+            # kept only for the record whose full document is kept
+            if index is None:
+                near_duplicates += 1
+            elif index == len(chunks_by_document):
+                chunks_by_document.append(record_chunks)
+            else:
+                near_duplicates += 1
+                chunks_by_document[index] = record_chunks
+        
+        for record_chunks in chunks_by_document:
+            chunked_documents.extend(record_chunks)
+        
+        if duplicates:
+            self.logger.info(f"Skipped {duplicates} records with duplicate content")
+        if near_duplicates:
+            self.logger.info(f"Merged {near_duplicates} near-duplicate full documents")
         
         # Type 3: Semantic documents (grouped by topic/endpoint)
-        semantic_documents = self._create_semantic_documents(records, document_id)
-        documents.extend(semantic_documents)
+        semantic_documents = self._create_semantic_documents(endpoint_groups, endpoint_counts, enhanced_texts)
+        
+        documents = full_documents + chunked_documents + semantic_documents
+        
+        # Number documents in output order
+        for document_id, doc in enumerate(documents):
+            doc.id = document_id
         
         # Save the complete dataset
         self._save_vectorization_dataset(documents)
@@ -194,106 +515,175 @@ class TextExtractor:
         
         return summary
     
-    def _create_full_documents(self, records: List[Dict], start_id: int) -> List[Dict[str, Any]]:
-        """Create full document representations."""
-        documents = []
+    def _expand_records(self, records: Iterable[Dict]) -> Iterator[Tuple[Document, List[Document], int]]:
+        """
+        Expand records into full and chunked documents, in record order.
         
-        for i, record in enumerate(records):
-            if len(record["content"].strip()) < self.min_text_length:
-                continue
-            
-            enhanced_text = self.enhance_text_with_context(
-                record["content"],
-                record["metadata"],
-                record["source_endpoint"]
-            )
-            
-            doc = {
-                "id": start_id + i,
-                "type": "full_document",
-                "source_record_id": record["id"],
-                "source_endpoint": record["source_endpoint"],
-                "title": self._extract_title(record),
-                "text": enhanced_text,
-                "metadata": record["metadata"],
-                "content_length": len(enhanced_text),
-                "keywords": self._extract_keywords(enhanced_text),
-                "educational_relevance": self._calculate_educational_relevance(enhanced_text)
-            }
+        Records are spread over worker processes unless workers is 1, or
+        workers is not set and there are fewer than EXPAND_POOL_MIN_RECORDS.
+        
+        Args:
+            records: Records to expand
             
-            documents.append(doc)
+        Yields:
+            Tuple of (full document, chunked documents, content SimHash) per record
+        """
+        workers = self.workers
+        if workers is None:
+            # Small datasets are not worth the process start-up cost
+            records = iter(records)
+            head = list(itertools.islice(records, EXPAND_POOL_MIN_RECORDS))
+            records = itertools.chain(head, records)
+            workers = 1 if len(head) < EXPAND_POOL_MIN_RECORDS else (os.cpu_count() or 1)
+        
+        if workers == 1:
+            for record in records:
+                yield self._expand_record(record)
+            return
+        
+        # Spawned rather than forked workers: extraction is usually run from a
+        # thread (main.py uses run_in_executor), and forking a process with
+        # other threads running can copy locks held by them
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(str(self.processed_data_dir),)) as pool:
+            yield from pool.imap(_expand_in_worker, records, chunksize=EXPAND_CHUNKSIZE)
+    
+    def _expand_record(self, record: Dict) -> Tuple[Document, List[Document], int]:
+        """Create the full and chunked documents and the content SimHash of a single record."""
+        enhanced_text = self.enhance_text_with_context(
+            record["content"],
+            record["metadata"],
+            record["source_endpoint"]
+        )
+        # Hashed here so the SimHash work is spread over the worker processes;
+        # the record content, not the enhanced text, so the shared context
+        # header does not make short records from one endpoint look alike
+        return (self._create_full_document(record, enhanced_text),
+                self._create_chunked_documents(record, enhanced_text),
+                _simhash(record["content"]))
+    
+    def _create_full_document(self, record: Dict, enhanced_text: str) -> Document:
+        """Create the full document representation of a record."""
+        keywords, relevance = self._analyze_text(enhanced_text)
+        return Document(
+            type="full_document",
+            source_record_id=record["id"],
+            source_endpoint=record["source_endpoint"],
+            title=self._extract_title(record),
+            text=enhanced_text,
+            metadata=record["metadata"],
+            keywords=keywords,
+            educational_relevance=relevance
+        )
+    
+    def _add_full_document(self, full_documents: List[Document], doc: Document, signature: int,
+                           simhash_bands: Dict[Tuple[int, int], List[int]],
+                           signatures: List[int]) -> Optional[int]:
+        """
+        Add a full document unless it is a near-duplicate of one already kept.
         
-        return documents
+        Of two near-duplicates the longer document is kept, in the place of
+        the first one.
+        
+        Args:
+            full_documents: Full documents kept so far
+            doc: Document to add
+            signature: SimHash of the document's record content
+            simhash_bands: SimHash band index shared across calls
+            signatures: Signature of the document kept at each index
+            
+        Returns:
+            Index the document was stored at, or None if it was dropped as a
+            near-duplicate of a longer document
+        """
+        band_mask = (1 << SIMHASH_BAND_BITS) - 1
+        bands = [(band, (signature >> shift) & band_mask)
+                 for band, shift in enumerate(range(0, 64, SIMHASH_BAND_BITS))]
+        
+        # Only documents sharing a band are compared, always against the
+        # signature of the document currently kept at that index
+        for band in bands:
+            for index in simhash_bands.get(band, ()):
+                if bin(signature ^ signatures[index]).count('1') <= self.simhash_threshold:
+                    if doc.content_length <= full_documents[index].content_length:
+                        return None
+                    
+                    # Keep the longer document and index it under its own bands
+                    full_documents[index] = doc
+                    signatures[index] = signature
+                    for new_band in bands:
+                        indices = simhash_bands.setdefault(new_band, [])
+                        if index not in indices:
+                            indices.append(index)
+                    return index
+        
+        index = len(full_documents)
+        full_documents.append(doc)
+        signatures.append(signature)
+        for band in bands:
+            simhash_bands.setdefault(band, []).append(index)
+        return index
     
-    def _create_chunked_documents(self, records: List[Dict], start_id: int) -> List[Dict[str, Any]]:
-        """Create chunked document representations."""
+    def _create_chunked_documents(self, record: Dict, enhanced_text: str) -> List[Document]:
+        """Create chunked document representations of a record."""
         documents = []
-        doc_id = start_id
         
-        for record in records:
-            if len(record["content"].strip()) < self.min_text_length:
-                continue
-            
-            enhanced_text = self.enhance_text_with_context(
-                record["content"],
-                record["metadata"],
-                record["source_endpoint"]
+        # Create chunks
+        chunks = self._split_text_into_chunks(enhanced_text)
+        
+        for i, chunk_text in enumerate(chunks):
+            keywords, relevance = self._analyze_text(chunk_text)
+            doc = Document(
+                type="chunked_document",
+                source_record_id=record["id"],
+                source_endpoint=record["source_endpoint"],
+                chunk_index=i,
+                total_chunks=len(chunks),
+                title=f"{self._extract_title(record)} (Del {i+1})",
+                text=chunk_text,
+                metadata=record["metadata"],
+                keywords=keywords,
+                educational_relevance=relevance
             )
             
-            # Create chunks
-            chunks = self._split_text_into_chunks(enhanced_text)
-            
-            for i, chunk_text in enumerate(chunks):
-                doc = {
-                    "id": doc_id,
-                    "type": "chunked_document",
-                    "source_record_id": record["id"],
-                    "source_endpoint": record["source_endpoint"],
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "title": f"{self._extract_title(record)} (Del {i+1})",
-                    "text": chunk_text,
-                    "metadata": record["metadata"],
-                    "content_length": len(chunk_text),
-                    "keywords": self._extract_keywords(chunk_text),
-                    "educational_relevance": self._calculate_educational_relevance(chunk_text)
-                }
-                
-                documents.append(doc)
-                doc_id += 1
+            documents.append(doc)
         
         return documents
     
-    def _create_semantic_documents(self, records: List[Dict], start_id: int) -> List[Dict[str, Any]]:
-        """Create semantically grouped documents."""
-        documents = []
-        
-        # Group records by endpoint
-        endpoint_groups = {}
-        for record in records:
-            endpoint = record["source_endpoint"]
-            if endpoint not in endpoint_groups:
-                endpoint_groups[endpoint] = []
-            endpoint_groups[endpoint].append(record)
+    def _create_semantic_documents(self, endpoint_groups: Dict[str, List[Dict]],
+                                   endpoint_counts: Dict[str, int],
+                                   enhanced_texts: Optional[Dict[str, str]] = None) -> List[Document]:
+        """
+        Create semantically grouped documents.
         
-        doc_id = start_id
+        Args:
+            endpoint_groups: First records of each endpoint (up to SEMANTIC_GROUP_LIMIT)
+            endpoint_counts: Total number of records per endpoint
+            enhanced_texts: Already enhanced texts by record ID; other records
+                are enhanced here
+        """
+        enhanced_texts = enhanced_texts or {}
+        documents = []
         
         # Create combined documents for each endpoint
         for endpoint, endpoint_records in endpoint_groups.items():
-            if len(endpoint_records) < 2:  # Skip single records
+            if endpoint_counts[endpoint] < 2:  # Skip single records
                 continue
             
             # Combine content from multiple records
             combined_texts = []
             combined_metadata = {}
             
-            for record in endpoint_records[:10]:  # Limit to first 10 records
+            for record in endpoint_records:
                 if len(record["content"].strip()) >= self.min_text_length:
-                    enhanced_text = self.enhance_text_with_context(
-                        record["content"],
-                        record["metadata"],
-                        record["source_endpoint"]
-                    )
+                    enhanced_text = enhanced_texts.get(record["id"])
+                    if enhanced_text is None:
+                        enhanced_text = self.enhance_text_with_context(
+                            record["content"],
+                            record["metadata"],
+                            record["source_endpoint"]
+                        )
                     combined_texts.append(enhanced_text)
                     
                     # Merge metadata
@@ -303,22 +693,20 @@ class TextExtractor:
             
             if combined_texts:
                 combined_text = f"\n{self.context_separator}\n".join(combined_texts)
+                keywords, relevance = self._analyze_text(combined_text)
                 
-                doc = {
-                    "id": doc_id,
-                    "type": "semantic_document",
-                    "source_endpoint": endpoint,
-                    "records_count": len(endpoint_records),
-                    "title": f"Samlet informasjon: {self._get_endpoint_context(endpoint)}",
-                    "text": combined_text,
-                    "metadata": combined_metadata,
-                    "content_length": len(combined_text),
-                    "keywords": self._extract_keywords(combined_text),
-                    "educational_relevance": self._calculate_educational_relevance(combined_text)
-                }
+                doc = Document(
+                    type="semantic_document",
+                    source_endpoint=endpoint,
+                    records_count=endpoint_counts[endpoint],
+                    title=f"Samlet informasjon: {self._get_endpoint_context(endpoint)}",
+                    text=combined_text,
+                    metadata=combined_metadata,
+                    keywords=keywords,
+                    educational_relevance=relevance
+                )
                 
                 documents.append(doc)
-                doc_id += 1
         
         return documents
     
@@ -336,69 +724,63 @@ class TextExtractor:
     
     def _split_text_into_chunks(self, text: str) -> List[str]:
         """Split text into overlapping chunks."""
-        if len(text) <= self.max_chunk_size:
-            return [text]
-        
-        chunks = []
+        return list(self._iter_text_chunks(text))
+    
+    def _iter_text_chunks(self, text: str) -> Iterator[str]:
+        """Yield overlapping chunks of text, breaking at spaces where possible."""
+        text_length = len(text)
+        if text_length <= self.max_chunk_size:
+            yield text
+            return
+        
+        # Space offsets, collected once; break points are found by bisection
+        spaces = [m.start() for m in _SPACE_RE.finditer(text)]
         start = 0
         
-        while start < len(text):
-            end = min(start + self.max_chunk_size, len(text))
+        while start < text_length:
+            end = min(start + self.max_chunk_size, text_length)
             
-            # Try to break at word boundaries
-            if end < len(text):
-                # Look for a good breaking point
-                break_point = text.rfind(' ', start, end)
-                if break_point > start + self.max_chunk_size // 2:
-                    end = break_point
+            # Try to break at the last space before end
+            if end < text_length:
+                i = bisect_left(spaces, end) - 1
+                if i >= 0 and spaces[i] > start + self.max_chunk_size // 2:
+                    end = spaces[i]
             
             chunk = text[start:end].strip()
             if len(chunk) >= self.min_text_length:
-                chunks.append(chunk)
+                yield chunk
             
             start = max(end - self.chunk_overlap, start + 1)
-        
-        return chunks
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract relevant keywords from text."""
-        keywords = []
+    def _analyze_text(self, text: str) -> Tuple[List[str], float]:
+        """
+        Extract keywords and score educational relevance in one pass.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Tuple of (keywords, educational relevance score 0-1)
+        """
         text_lower = text.lower()
         
         # Find educational keywords
-        for keyword in self.educational_keywords:
-            if keyword in text_lower:
-                keywords.append(keyword)
+        found = _find_terms(self._keyword_automaton, self.educational_keywords, text_lower)
+        keywords = set(found)
         
         # Extract potential other keywords (simple approach)
-        words = re.findall(r'\b[a-zA-ZæøåÆØÅ]{4,}\b', text)
-        word_freq = {}
-        for word in words:
-            word_lower = word.lower()
-            if word_lower not in ['dette', 'være', 'skal', 'eller', 'hvor', 'også', 'hvis']:
-                word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
-        
-        # Add most frequent words
-        frequent_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
-        keywords.extend([word for word, freq in frequent_words if freq > 1])
-        
-        return list(set(keywords))  # Remove duplicates
-    
-    def _calculate_educational_relevance(self, text: str) -> float:
-        """Calculate educational relevance score (0-1)."""
-        text_lower = text.lower()
+        word_freq = Counter(word for word in _WORD_RE.findall(text_lower) if word not in STOPWORDS)
         
-        # Count educational keywords
-        keyword_matches = sum(1 for keyword in self.educational_keywords if keyword in text_lower)
-        keyword_score = min(keyword_matches / 10.0, 1.0)  # Normalize
+        # Add most frequent words; ties keep first-occurrence order
+        keywords.update(word for word, freq in word_freq.most_common(5) if freq > 1)
         
-        # Check for educational context indicators
-        context_indicators = [
-            'utdanning', 'skole', 'studium', 'læring', 'kurs', 'eksamen',
-            'kompetanse', 'kvalifikasjon', 'yrke', 'karriere', 'jobb'
-        ]
+        # Count educational keywords
+        keyword_score = min(len(found) / 10.0, 1.0)  # Normalize
         
-        context_matches = sum(1 for indicator in context_indicators if indicator in text_lower)
+        # Context indicators are mostly keywords too; only scan for the rest
+        context_matches = len(found & self._keyword_indicators)
+        if self._extra_indicators:
+            context_matches += len(_find_terms(self._indicator_automaton, self._extra_indicators, text_lower))
         context_score = min(context_matches / 5.0, 1.0)  # Normalize
         
         # Length factor (longer texts might be more comprehensive)
@@ -407,76 +789,81 @@ class TextExtractor:
         # Weighted average
         relevance = (keyword_score * 0.4) + (context_score * 0.4) + (length_score * 0.2)
         
-        return round(relevance, 3)
+        return list(keywords), round(relevance, 3)
+    
+    def _extract_keywords(self, text: str) -> List[str]:
+        """Extract relevant keywords from text."""
+        return self._analyze_text(text)[0]
     
-    def _save_vectorization_dataset(self, documents: List[Dict]) -> None:
+    def _calculate_educational_relevance(self, text: str) -> float:
+        """Calculate educational relevance score (0-1)."""
+        return self._analyze_text(text)[1]
+    
+    def _save_vectorization_dataset(self, documents: List[Document]) -> None:
         """Save the vectorization dataset in multiple formats."""
-        # JSON format
-        with open(self.text_output_dir / "vectorization_dataset.json", 'w', encoding='utf-8') as f:
-            json.dump(documents, f, ensure_ascii=False, indent=2)
-        
-        # CSV format for easy analysis
-        df_data = []
-        for doc in documents:
-            df_data.append({
-                "id": doc["id"],
-                "type": doc["type"],
-                "source_endpoint": doc.get("source_endpoint", ""),
-                "title": doc["title"][:100] + "..." if len(doc["title"]) > 100 else doc["title"],
-                "content_length": doc["content_length"],
-                "keyword_count": len(doc["keywords"]),
-                "educational_relevance": doc["educational_relevance"],
-                "text_preview": doc["text"][:200] + "..." if len(doc["text"]) > 200 else doc["text"]
-            })
-        
-        df = pd.DataFrame(df_data)
-        df.to_csv(self.text_output_dir / "vectorization_dataset.csv", index=False, encoding='utf-8')
-        df.to_parquet(self.text_output_dir / "vectorization_dataset.parquet", index=False)
+        # JSON array, written one document at a time
+        with open(self.text_output_dir / "vectorization_dataset.json", 'wb') as json_file:
+            json_file.write(b'[\n')
+            for i, doc in enumerate(documents):
+                if i:
+                    json_file.write(b',\n')
+                json_file.write(_dumps_document(doc))
+            json_file.write(b'\n]\n')
+        
+        # CSV and Parquet summaries, written row by row and in batches
+        with open(self.text_output_dir / "vectorization_dataset.csv", 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_SCHEMA.names, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(_summary_row(doc) for doc in documents)
+        
+        with pq.ParquetWriter(self.text_output_dir / "vectorization_dataset.parquet", SUMMARY_SCHEMA) as writer:
+            for start in range(0, len(documents), PARQUET_BATCH_SIZE):
+                rows = [_summary_row(doc) for doc in documents[start:start + PARQUET_BATCH_SIZE]]
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=SUMMARY_SCHEMA))
         
         # Text-only file for simple vectorization
-        with open(self.text_output_dir / "texts_only.txt", 'w', encoding='utf-8') as f:
+        separator = b"=" * 80 + b"\n\n"
+        with open(self.text_output_dir / "texts_only.txt", 'wb') as f:
+            buffer = bytearray()
             for doc in documents:
-                f.write(f"ID: {doc['id']}\n")
-                f.write(f"Title: {doc['title']}\n")
-                f.write(f"Text: {doc['text']}\n")
-                f.write("=" * 80 + "\n\n")
+                buffer += f"ID: {doc.id}\nTitle: {doc.title}\nText: {doc.text}\n".encode('utf-8')
+                buffer += separator
+                if len(buffer) >= TEXT_FLUSH_BYTES:
+                    f.write(buffer)
+                    buffer.clear()
+            f.write(buffer)
     
-    def _analyze_dataset(self, documents: List[Dict]) -> Dict[str, Any]:
+    def _analyze_dataset(self, documents: List[Document]) -> Dict[str, Any]:
         """Analyze the created dataset."""
         total_docs = len(documents)
         
-        # Document type distribution
-        type_counts = {}
-        for doc in documents:
-            doc_type = doc["type"]
-            type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
-        
-        # Endpoint distribution
-        endpoint_counts = {}
-        for doc in documents:
-            endpoint = doc.get("source_endpoint", "unknown")
-            endpoint_counts[endpoint] = endpoint_counts.get(endpoint, 0) + 1
+        # Document type and endpoint distribution
+        type_counts = Counter(doc.type for doc in documents)
+        endpoint_counts = Counter(doc.source_endpoint or "unknown" for doc in documents)
         
-        # Content statistics
-        content_lengths = [doc["content_length"] for doc in documents]
-        relevance_scores = [doc["educational_relevance"] for doc in documents]
+        # Content statistics, each array built once
+        content_lengths = np.fromiter((doc.content_length for doc in documents),
+                                      dtype=np.int64, count=total_docs)
+        relevance_scores = np.fromiter((doc.educational_relevance for doc in documents),
+                                       dtype=np.float64, count=total_docs)
+        has_docs = total_docs > 0
         
         summary = {
             "total_documents": total_docs,
-            "document_types": type_counts,
-            "endpoint_distribution": dict(sorted(endpoint_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
+            "document_types": dict(type_counts),
+            "endpoint_distribution": dict(endpoint_counts.most_common(10)),
             "content_statistics": {
-                "total_content_length": sum(content_lengths),
-                "average_content_length": np.mean(content_lengths) if content_lengths else 0,
-                "min_content_length": min(content_lengths) if content_lengths else 0,
-                "max_content_length": max(content_lengths) if content_lengths else 0,
-                "median_content_length": np.median(content_lengths) if content_lengths else 0
+                "total_content_length": int(content_lengths.sum()),
+                "average_content_length": float(content_lengths.mean()) if has_docs else 0,
+                "min_content_length": int(content_lengths.min()) if has_docs else 0,
+                "max_content_length": int(content_lengths.max()) if has_docs else 0,
+                "median_content_length": float(np.median(content_lengths)) if has_docs else 0
             },
             "educational_relevance": {
-                "average_relevance": np.mean(relevance_scores) if relevance_scores else 0,
-                "high_relevance_docs": sum(1 for score in relevance_scores if score > 0.7),
-                "medium_relevance_docs": sum(1 for score in relevance_scores if 0.3 <= score <= 0.7),
-                "low_relevance_docs": sum(1 for score in relevance_scores if score < 0.3)
+                "average_relevance": float(relevance_scores.mean()) if has_docs else 0,
+                "high_relevance_docs": int(np.count_nonzero(relevance_scores > 0.7)),
+                "medium_relevance_docs": int(np.count_nonzero((relevance_scores >= 0.3) & (relevance_scores <= 0.7))),
+                "low_relevance_docs": int(np.count_nonzero(relevance_scores < 0.3))
             },
             "files_created": [
                 "vectorization_dataset.json",
@@ -487,8 +874,7 @@ class TextExtractor:
         }
         
         # Save analysis summary
-        with open(self.text_output_dir / "dataset_analysis.json", 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        _write_json(self.text_output_dir / "dataset_analysis.json", summary, indent=True)
         
         return summary
 
@@ -7,9 +7,80 @@ import json
 import re
 import asyncio
 import aiohttp
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Set, Any, Optional, Tuple
 from pathlib import Path
 import logging
+import os
+import heapq
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import ijson
+except ImportError:  # Fall back to loading each file whole
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library json module
+    orjson = None
+
+# Typical IDs: numeric, y_*, u_*, or alphanumeric codes
+_ID_RE = re.compile(r'^(?:[yuv]_|[0-9]+|[a-zA-Z0-9-]+)$')
+
+# {param} placeholders in a URL template
+_PARAM_RE = re.compile(r'\{([^}]+)\}')
+
+# Raw files that are download summaries rather than API data
+SUMMARY_STEMS = frozenset(['complete_download_summary', 'parameterized_download_summary'])
+
+# Cached ID analysis in raw_data_dir; bump the version when extraction changes.
+# Stored as JSON rather than pickle, since loading a planted pickle runs code;
+# no .json suffix, so it is never read back as a raw data file
+ID_CACHE_FILE = '.id_cache'
+ID_CACHE_VERSION = 2
+
+# Fewest raw files worth starting worker processes for
+ID_POOL_MIN_FILES = 50
+
+# Field names whose values are collected as IDs
+DEFAULT_ID_FIELDS = [
+    'id', 'nid', 'uno_id', 'programomradekode10', 'yrkeskode_styrk08', 
+    'styrk98_kode', 'nus_kode', 'vilbli_org_id', 'org_id'
+]
+
+
+def _id_field_pattern(id_fields: List[str]) -> re.Pattern:
+    """
+    Compile ID field names into one alternation matched against lowercased keys.
+    
+    A single search replaces one substring test per field. Keys are still
+    lowercased first rather than matched with re.IGNORECASE, which also
+    folds characters like 'İ' that str.lower() keeps distinct.
+    """
+    return re.compile('|'.join(re.escape(id_field) for id_field in id_fields))
+
+
+_ID_FIELD_RE = _id_field_pattern(DEFAULT_ID_FIELDS)
+
+
+def _is_valid_id(val: str) -> bool:
+    """Check if a string looks like a valid ID rather than a path or filename."""
+    if not val or len(val) > 40:
+        return False
+    # Plain numbers are the most common IDs; isascii() keeps out digits like
+    # '²' that isdigit() accepts but the pattern does not
+    if val.isdigit() and val.isascii():
+        return True
+    # Exclude strings that look like internal JSON paths or complex structures
+    if val.count('_') > 4 or val.count('.') > 2 or ';' in val:
+        return False
+    # Spaces and slashes (text, URLs, paths) never match the pattern
+    if ' ' in val or '/' in val:
+        return False
+    # Typical IDs: numeric, y_*, u_*, or alphanumeric codes
+    return _ID_RE.match(val) is not None
 
 
 class URLProcessor:
@@ -40,56 +111,129 @@ class URLProcessor:
         Returns:
             Set of extracted ID values
         """
-        if id_fields is None:
-            id_fields = [
-                'id', 'nid', 'uno_id', 'programomradekode10', 'yrkeskode_styrk08', 
-                'styrk98_kode', 'nus_kode', 'vilbli_org_id', 'org_id'
-            ]
+        id_field_re = _ID_FIELD_RE if id_fields is None else _id_field_pattern(id_fields)
         
         ids = set()
+        # Bound once; called for every ID found in the walk below
+        add = ids.add
+        search = id_field_re.search
+        # Documents repeat the same few keys, so test each distinct key once
+        key_is_id = {}
         
-        def is_valid_id(val: str) -> bool:
-            """Check if a string looks like a valid ID rather than a path or filename."""
-            if not val or len(val) > 40:
-                return False
-            # Exclude strings that look like internal JSON paths or complex structures
-            if val.count('_') > 4 or val.count('.') > 2 or ';' in val:
-                return False
-            # Typical IDs: numeric, y_*, u_*, or alphanumeric codes
-            if re.match(r'^(y_|u_|v_|[0-9]+|[a-zA-Z0-9-]+)$', val):
-                return True
-            return False
-
-        def recursive_extract(obj, path=""):
-            """Recursively extract IDs from nested data."""
+        def check_leaf(obj, under_id_field):
+            """Add a scalar below an ID-like field if it looks like an ID."""
+            if under_id_field and isinstance(obj, (str, int)) and obj:
+                # Check if this looks like an ID (numeric or alphanumeric)
+                str_val = str(obj)
+                if _is_valid_id(str_val):
+                    add(str_val)
+        
+        # Walk the data with an explicit stack of (container, whether an
+        # enclosing key is an ID field); scalars are checked in place
+        stack = deque([(data, False)])
+        while stack:
+            obj, under_id_field = stack.pop()
             if isinstance(obj, dict):
                 for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
+                    key_is_id_field = key_is_id.get(key)
+                    if key_is_id_field is None:
+                        key_is_id_field = key_is_id[key] = search(key.lower()) is not None
                     
                     # Check if this field might be an ID
-                    if any(id_field in key.lower() for id_field in id_fields):
-                        if isinstance(value, (str, int)):
-                            str_val = str(value)
-                            if is_valid_id(str_val):
-                                ids.add(str_val)
+                    if key_is_id_field and isinstance(value, (str, int)):
+                        str_val = str(value)
+                        if _is_valid_id(str_val):
+                            add(str_val)
                     
-                    # Recurse into nested objects
-                    recursive_extract(value, current_path)
+                    child_under_id_field = under_id_field or key_is_id_field
+                    if isinstance(value, (dict, list)):
+                        stack.append((value, child_under_id_field))
+                    else:
+                        check_leaf(value, child_under_id_field)
                     
             elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    recursive_extract(item, f"{path}[{i}]")
+                for item in obj:
+                    if isinstance(item, (dict, list)):
+                        stack.append((item, under_id_field))
+                    else:
+                        check_leaf(item, under_id_field)
+        
+        return ids
+    
+    def extract_ids_from_stream(self, f, id_fields: List[str] = None) -> Set[str]:
+        """
+        Extract potential IDs from a JSON file while parsing it with ijson.
+        
+        Selects the same values as extract_ids_from_data without building
+        the parsed document.
+        
+        Args:
+            f: JSON file opened in binary mode
+            id_fields: Specific field names to look for IDs
             
-            elif isinstance(obj, (str, int)) and obj:
-                # Check if this looks like an ID (numeric or alphanumeric)
-                str_val = str(obj)
-                if is_valid_id(str_val):
-                    if path and any(id_field in path.lower() for id_field in id_fields):
-                        ids.add(str_val)
+        Returns:
+            Set of extracted ID values
+        """
+        id_field_re = _ID_FIELD_RE if id_fields is None else _id_field_pattern(id_fields)
+        
+        ids = set()
+        # Bound once; called for every key and ID event below
+        add = ids.add
+        search = id_field_re.search
+        # Documents repeat the same few keys, so test each distinct key once
+        key_is_id = {}
+        
+        # Per open container: (is a dict, whether an enclosing key is an ID field)
+        containers = []
+        key_is_id_field = False
+        
+        for _, event, value in ijson.parse(f, use_float=True):
+            if event == 'map_key':
+                key_is_id_field = key_is_id.get(value)
+                if key_is_id_field is None:
+                    key_is_id_field = key_is_id[value] = search(value.lower()) is not None
+                continue
+            
+            in_dict = bool(containers) and containers[-1][0]
+            under_id_field = bool(containers) and containers[-1][1]
+            if in_dict:
+                under_id_field = under_id_field or key_is_id_field
+            
+            if event in ('start_map', 'start_array'):
+                containers.append((event == 'start_map', under_id_field))
+            elif event in ('end_map', 'end_array'):
+                containers.pop()
+            elif isinstance(value, (str, int)):
+                # Values of ID fields count even when falsy, like 0
+                if (in_dict and key_is_id_field) or (under_id_field and value):
+                    str_val = str(value)
+                    if _is_valid_id(str_val):
+                        add(str_val)
         
-        recursive_extract(data)
         return ids
     
+    def extract_ids_from_file(self, json_file: Path) -> Set[str]:
+        """
+        Extract potential IDs from a raw JSON file.
+        
+        Args:
+            json_file: Path to raw JSON file
+            
+        Returns:
+            Set of extracted ID values
+        """
+        # Stream the file when ijson is installed
+        if ijson is not None:
+            with open(json_file, 'rb') as f:
+                return self.extract_ids_from_stream(f)
+        
+        if orjson is not None:
+            data = orjson.loads(json_file.read_bytes())
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        return self.extract_ids_from_data(data)
+    
     def analyze_downloaded_data_for_ids(self) -> Dict[str, Set[str]]:
         """
         Analyze all downloaded data to extract potential IDs.
@@ -102,17 +246,49 @@ class URLProcessor:
         
         self.logger.info("Analyzing downloaded data for ID extraction...")
         
-        for json_file in raw_data_dir.glob("*.json"):
-            # Skip summary files and parameterized download results
-            if json_file.stem in ['complete_download_summary', 'parameterized_download_summary'] or json_file.stem.startswith('param_'):
-                continue
-
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Extract IDs from this file
-                ids = self.extract_ids_from_data(data)
+        # Skip summary files and parameterized download results by name,
+        # before any Path objects are created
+        with os.scandir(raw_data_dir) as entries:
+            json_entries = [
+                entry for entry in entries
+                if entry.name.endswith('.json')
+                and entry.name[:-5] not in SUMMARY_STEMS
+                and not entry.name.startswith('param_')
+            ]
+        json_files = [Path(entry.path) for entry in json_entries]
+        
+        # Reuse the last analysis if no raw file was added, removed or changed
+        cache_file = raw_data_dir / ID_CACHE_FILE
+        cache_key = [ID_CACHE_VERSION, sorted(
+            [entry.name, entry.stat().st_mtime_ns, entry.stat().st_size]
+            for entry in json_entries
+        )]
+        cached = self._load_id_cache(cache_file, cache_key)
+        if cached is not None:
+            self.logger.info(f"Using cached ID analysis for {len(json_files)} files")
+            return cached
+        
+        had_errors = False
+        
+        # Files are independent, so extract their IDs across processes, unless
+        # there are too few files to be worth the process start-up cost
+        pool = None
+        if len(json_files) >= ID_POOL_MIN_FILES:
+            # Spawned rather than forked workers: this usually runs in an
+            # executor thread, and forking a process with other threads
+            # running can copy locks held by them
+            pool = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                       mp_context=multiprocessing.get_context("spawn"))
+            results = pool.map(_process_file, json_files, chunksize=4)
+        else:
+            results = map(_process_file, json_files)
+        
+        try:
+            for json_file, (ids, error) in zip(json_files, results):
+                if error is not None:
+                    self.logger.warning(f"Error processing {json_file}: {error}")
+                    had_errors = True
+                    continue
                 
                 # Categorize IDs based on filename/context
                 filename = json_file.stem
@@ -120,12 +296,60 @@ class URLProcessor:
                 
                 if ids:
                     self.logger.debug(f"Found {len(ids)} potential IDs in {filename}")
-                
-            except Exception as e:
-                self.logger.warning(f"Error processing {json_file}: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        # A file that failed may only have been mid-write, so don't cache that run
+        if not had_errors:
+            self._save_id_cache(cache_file, cache_key, id_collections)
         
         return id_collections
     
+    def _load_id_cache(self, cache_file: Path, cache_key: List) -> Optional[Dict[str, Set[str]]]:
+        """
+        Load a cached ID analysis if it was made from the same raw files.
+        
+        Args:
+            cache_file: Path to the cache file
+            cache_key: Version and (name, mtime, size) of every raw file
+            
+        Returns:
+            Cached ID collections, or None if missing, stale or unreadable
+        """
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("key") != cache_key:
+                return None
+            return {source: set(ids) for source, ids in cached["collections"].items()}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable ID cache {cache_file}: {e}")
+            return None
+    
+    def _save_id_cache(self, cache_file: Path, cache_key: List, id_collections: Dict[str, Set[str]]):
+        """
+        Save an ID analysis next to the raw files it was made from.
+        
+        Args:
+            cache_file: Path to the cache file
+            cache_key: Version and (name, mtime, size) of every raw file
+            id_collections: Extracted IDs by source
+        """
+        # Write to a temporary file first so a crash never leaves a partial cache
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "key": cache_key,
+                    "collections": {source: sorted(ids) for source, ids in id_collections.items()}
+                }, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.logger.warning(f"Could not save ID cache {cache_file}: {e}")
+    
     def match_ids_to_parameterized_urls(self, parameterized_urls: List[str], id_collections: Dict[str, Set[str]]) -> Dict[str, List[str]]:
         """
         Match extracted IDs to parameterized URLs.
@@ -139,9 +363,19 @@ class URLProcessor:
         """
         url_mappings = {}
         
+        # Bucket each source's IDs by their two-character prefix (e.g. 'y_')
+        # once, so prefix filtering is a lookup instead of a scan per template
+        prefix_buckets = {}
+        for source, ids in id_collections.items():
+            buckets = {}
+            for val in ids:
+                buckets.setdefault(val[:2], set()).add(val)
+            prefix_buckets[source] = buckets
+        source_names = [(source, source.lower()) for source in id_collections]
+        
         for url_template in parameterized_urls:
             # Extract parameter names from URL
-            param_names = re.findall(r'\{([^}]+)\}', url_template)
+            param_names = _PARAM_RE.findall(url_template)
             concrete_urls = []
             
             for param_name in param_names:
@@ -156,29 +390,28 @@ class URLProcessor:
                     prefix_filter = "u_"
 
                 # Look for IDs that might match this parameter
-                for source, ids in id_collections.items():
+                for source, source_lower in source_names:
                     # Simple heuristics for matching
-                    field_match = param_name.lower() in source.lower() or (param_name == 'id' and 'id' in source.lower())
+                    field_match = param_name.lower() in source_lower or (param_name == 'id' and 'id' in source_lower)
                     
                     if field_match:
-                        for val in ids:
-                            if prefix_filter:
-                                if val.startswith(prefix_filter):
-                                    matching_ids.add(val)
-                            else:
-                                matching_ids.add(val)
+                        if prefix_filter:
+                            matching_ids.update(prefix_buckets[source].get(prefix_filter, ()))
+                        else:
+                            matching_ids.update(id_collections[source])
                 
                 # Generate concrete URLs
                 if matching_ids:
-                    # Sort to ensure consistency and take a limited sample
-                    sorted_ids = sorted(list(matching_ids))
-                    for id_val in sorted_ids[:100]:  # Limit to first 100 IDs
+                    # Take the 100 smallest IDs, in order, for a consistent
+                    # sample without sorting every match
+                    for id_val in heapq.nsmallest(100, matching_ids):
                         concrete_url = url_template.replace(f'{{{param_name}}}', str(id_val))
                         concrete_urls.append(concrete_url)
             
             if concrete_urls:
-                url_mappings[url_template] = concrete_urls
-                self.logger.info(f"Generated {len(concrete_urls)} URLs from template: {url_template}")
+                # A repeated placeholder expands to the same URL more than once
+                url_mappings[url_template] = list(dict.fromkeys(concrete_urls))
+                self.logger.info(f"Generated {len(url_mappings[url_template])} URLs from template: {url_template}")
         
         return url_mappings
     
@@ -195,37 +428,37 @@ class URLProcessor:
         # Get parameterized URLs
         param_urls = [
             url_config["url"] for url_config in url_list 
-            if self.downloader._is_parameterized_url(url_config["url"]) 
+            if _PARAM_RE.search(url_config["url"]) is not None
             and url_config.get("method", "GET") == "GET"
         ]
         
         if not param_urls:
             return {"message": "No parameterized URLs to process"}
         
-        # Analyze downloaded data for IDs
-        id_collections = self.analyze_downloaded_data_for_ids()
+        # Analyze downloaded data for IDs off the event loop, so consumers of
+        # saved_files_queue keep running while the files are read and parsed
+        loop = asyncio.get_running_loop()
+        id_collections = await loop.run_in_executor(None, self.analyze_downloaded_data_for_ids)
         
         # Match IDs to URLs
         url_mappings = self.match_ids_to_parameterized_urls(param_urls, id_collections)
         
         # Download concrete URLs
-        results = []
         semaphore = asyncio.Semaphore(self.downloader.max_concurrent)
         
+        # Templates can expand to the same concrete URL (e.g. a template
+        # listed twice), so download each URL once, in first-seen order
+        unique_urls = {}
         for template, concrete_urls in url_mappings.items():
             self.logger.info(f"Downloading {len(concrete_urls)} URLs for template: {template}")
-            
-            # Limit concurrent downloads per template
-            for i in range(0, len(concrete_urls), 50):  # Process in batches of 50
-                batch = concrete_urls[i:i+50]
-                tasks = []
-                
-                for url in batch:
-                    task = self._download_parameterized_url(url, semaphore)
-                    tasks.append(task)
-                
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                results.extend([r for r in batch_results if not isinstance(r, Exception)])
+            unique_urls.update(dict.fromkeys(concrete_urls))
+        self.logger.info(f"Downloading {len(unique_urls)} unique URLs from {len(url_mappings)} templates")
+        tasks = [self._download_parameterized_url(url, semaphore) for url in unique_urls]
+        
+        # The semaphore limits concurrent downloads, so schedule every URL at once
+        # instead of waiting for the slowest request of each batch
+        all_results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = [r for r in all_results if not isinstance(r, Exception)]
         
         # Compile summary
         successful = [r for r in results if r.get("success", False)]
@@ -234,6 +467,7 @@ class URLProcessor:
         summary = {
             "parameterized_templates": len(url_mappings),
             "total_concrete_urls": sum(len(urls) for urls in url_mappings.values()),
+            "unique_concrete_urls": len(unique_urls),
             "successful_downloads": len(successful),
             "failed_downloads": len(failed),
             "url_mappings": {k: len(v) for k, v in url_mappings.items()},
@@ -259,7 +493,7 @@ class URLProcessor:
         async with semaphore:
             await asyncio.sleep(self.downloader.rate_limit)
             
-            data = await self.downloader._make_request(url, self.downloader.session)
+            data, data_size = await self.downloader._make_sized_request(url, self.downloader.session)
             if data is not None:
                 # Create a safe filename for parameterized URLs
                 filename = self.downloader._sanitize_filename(url)
@@ -272,28 +506,60 @@ class URLProcessor:
                         "success": True, 
                         "url": url, 
                         "filename": filename, 
-                        "data_size": len(str(data))
+                        "data_size": data_size
                     }
             
             return {"success": False, "url": url, "reason": "Request failed"}
 
 
+# Processor reused by every file a worker process handles
+_worker_processor = None
+
+
+def _process_file(json_file: Path) -> Tuple[Optional[Set[str]], Optional[str]]:
+    """
+    Extract the IDs of a single raw file, in a worker process or inline.
+    
+    Args:
+        json_file: Path to raw JSON file
+        
+    Returns:
+        Tuple of (extracted IDs, error message); IDs are None if the file failed
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = URLProcessor(downloader=None)
+    
+    try:
+        return _worker_processor.extract_ids_from_file(json_file), None
+    except Exception as e:
+        return None, str(e)
+
+
 # Integration with the main downloader
-async def download_with_parameterized_support(url_list_file: str, output_dir: str = "utdanning_data"):
+async def download_with_parameterized_support(
+    url_list_file: str,
+    output_dir: str = "utdanning_data",
+    saved_files_queue: Optional[asyncio.Queue] = None,
+    downloader_config: Optional[Dict[str, Any]] = None
+):
     """
     Complete download process including parameterized URLs.
     
     Args:
         url_list_file: Path to URL list JSON
         output_dir: Output directory for data
+        saved_files_queue: Optional queue that receives the path of each saved file
+        downloader_config: Optional UtdanningAPIDownloader settings
+            (max_concurrent, rate_limit, retry_attempts, timeout)
     """
     from api_downloader import UtdanningAPIDownloader
     
-    downloader = UtdanningAPIDownloader(
-        output_dir=output_dir,
-        max_concurrent=5,
-        rate_limit=0.2
-    )
+    settings = {"max_concurrent": 5, "rate_limit": 0.2}
+    settings.update(downloader_config or {})
+    
+    downloader = UtdanningAPIDownloader(output_dir=output_dir, **settings)
+    downloader.saved_files_queue = saved_files_queue
     
     async with downloader:
         # Phase 1: Download simple endpoints